@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Sequence
+
+from starlette.requests import ClientDisconnect
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import admission_in_flight, admission_limit, admission_rejected_total
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdaptiveLimit:
+    """Limite de concorrência ajustado pela latência observada (gradiente + AIMD).
+
+    Compara a latência recente (EWMA curta) com a de referência (EWMA longa,
+    a latência "sem fila"): enquanto a recente fica dentro de `tolerance` x a
+    referência, o limite cresce ~sqrt(limite) por ajuste; quando a fila se
+    forma, a razão referência/recente < 1 encolhe o limite na mesma proporção
+    (no máximo pela metade). Erros 5xx cortam o limite em `backoff`
+    (diminuição multiplicativa). Só cresce quando está sendo usado: com pouca
+    carga o limite não sobe sem evidência de que aguenta.
+
+    Não é thread-safe: acquire/release rodam no event loop (middleware ASGI).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        smoothing: float = 0.2,
+    ) -> None:
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self._short: float | None = None
+        self._long: float | None = None
+        self._limit_gauge = admission_limit.labels(budget=name)
+        self._in_flight_gauge = admission_in_flight.labels(budget=name)
+        self._limit_gauge.set(self.limit)
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            admission_rejected_total.labels(budget=self.name).inc()
+            return False
+        self.in_flight += 1
+        self._in_flight_gauge.inc()
+        return True
+
+    def release(self, latency: float | None, failed: bool = False) -> None:
+        """Devolve a vaga; `latency=None` (cancelada, cliente desconectou) não ajusta o limite."""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        self._in_flight_gauge.dec()
+        if latency is None:
+            return
+        if failed:
+            self._set(self.limit * self.backoff)
+            return
+        self._short = latency if self._short is None else self._short + 0.1 * (latency - self._short)
+        if self._long is None:
+            self._long = latency
+        elif self._long > 2 * self._short:
+            # Referência bem acima do atual (ex.: warm-up lento): converge rápido para baixo
+            self._long = 0.95 * self._long + 0.05 * self._short
+        else:
+            self._long = self._long + 0.002 * (latency - self._long)
+        gradient = max(0.5, min(1.0, self.tolerance * self._long / self._short))
+        # Sem carga (menos da metade do limite em uso) não há por que crescer
+        headroom = math.sqrt(self.limit) if in_flight * 2 >= self.limit else 0.0
+        target = self.limit * gradient + headroom
+        self._set(self.limit * (1 - self.smoothing) + target * self.smoothing)
+
+    def _set(self, value: float) -> None:
+        self.limit = min(max(value, float(self.min_limit)), float(self.max_limit))
+        self._limit_gauge.set(self.limit)
+
+
+class AdmissionControlMiddleware:
+    """Load shedding antes do handler: acima do limite responde 503 na hora.
+
+    Orçamentos separados para leitura (GET/HEAD/OPTIONS) e escrita (demais
+    métodos), então uma rajada de listagens não impede escritas e vice-versa.
+    Sem fila: o 503 com Retry-After custa microssegundos, enquanto esperar no
+    threadpool/pool do banco só aumenta a latência de todos até os timeouts.
+    `exempt_paths` (prefixos) não passam pelo limite: /metrics, docs e
+    streams longos (SSE, export), cuja duração distorceria a latência.
+
+    Falha (corte do limite) é um 5xx enviado ou uma exceção do handler, que vira
+    500 no ServerErrorMiddleware (ex.: timeout do pool). Cancelamento e
+    desconexão do cliente só devolvem a vaga, sem amostra de latência.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        read: AdaptiveLimit,
+        write: AdaptiveLimit,
+        retry_after: int = 1,
+        exempt_paths: Sequence[str] = (),
+    ) -> None:
+        self.app = app
+        self.read = read
+        self.write = write
+        self.retry_after = str(retry_after).encode("latin-1")
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.read if scope["method"] in READ_METHODS else self.write
+        if not budget.try_acquire():
+            await self._reject(send)
+            return
+
+        start = time.perf_counter()
+        status_code: int | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except (asyncio.CancelledError, ClientDisconnect):
+            budget.release(None)
+            raise
+        except BaseException:
+            budget.release(time.perf_counter() - start, failed=True)
+            raise
+        if status_code is None:
+            budget.release(None)
+        else:
+            budget.release(time.perf_counter() - start, failed=status_code >= 500)
+
+    async def _reject(self, send: Send) -> None:
+        body = b'{"detail":"Servidor sobrecarregado; tente novamente em instantes"}'
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", self.retry_after),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Union
+
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import repository, repository_async
+from .config import Settings, get_settings
+from .enums import Status
+from .etags import list_etag
+from .metrics import cache_errors_total, cache_evictions_total, cache_hits_total, cache_misses_total
+from .schemas import ItemOut
+from .singleflight import list_flight, list_flight_async
+
+logger = logging.getLogger(__name__)
+
+
+# ---- Backends ----------------------------------------------------------------
+
+class MemoryCache:
+    """TTL + LRU em processo (OrderedDict). Cada worker tem a sua cópia."""
+
+    name = 'memory'
+    blocking = False
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: 'OrderedDict[str, tuple[float, Any]]' = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                cache_evictions_total.labels(backend=self.name, reason='ttl').inc()
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                cache_evictions_total.labels(backend=self.name, reason='lru').inc()
+
+    def incr(self, key: str) -> int | None:
+        # Contador de geração: nunca expira nem é despejado pelo LRU
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            return self._generations[key]
+
+    def generation(self, key: str) -> int | None:
+        return self._generations.get(key, 0)
+
+
+class RedisCache:
+    """Backend compartilhado entre workers/réplicas (requer `redis`).
+
+    Falhas do Redis (fora do ar, timeout) não viram 500: contam em
+    cache_errors_total e a requisição segue como se o cache estivesse vazio.
+    Sem geração legível (`generation` -> None) nada é lido nem gravado.
+    """
+
+    name = 'redis'
+    blocking = True  # cliente síncrono: em handlers async roda no threadpool
+
+    _adapter: TypeAdapter[Union[ItemOut, List[ItemOut], str]] = TypeAdapter(Union[ItemOut, List[ItemOut], str])
+
+    def __init__(self, url: str, ttl: float, prefix: str = 'items-api:') -> None:
+        try:
+            import redis  # type: ignore
+        except Exception:  # pragma: no cover - optional at runtime
+            raise RuntimeError('CACHE_BACKEND=redis requer o pacote "redis".')
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self._errors: tuple[type[BaseException], ...] = (redis.RedisError,)
+
+    def _failed(self, op: str) -> None:
+        cache_errors_total.labels(backend=self.name, op=op).inc()
+
+    def get(self, key: str) -> Any | None:
+        try:
+            raw = self._client.get(self.prefix + key)
+        except self._errors:
+            self._failed('get')
+            return None
+        return None if raw is None else self._adapter.validate_json(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        # Expiração e despejo (maxmemory-policy allkeys-lru) ficam a cargo do Redis
+        try:
+            self._client.set(self.prefix + key, self._adapter.dump_json(value), px=int(self.ttl * 1000))
+        except self._errors:
+            self._failed('set')
+
+    def incr(self, key: str) -> int | None:
+        try:
+            return int(self._client.incr(self.prefix + key))
+        except self._errors:
+            self._failed('incr')
+            return None
+
+    def generation(self, key: str) -> int | None:
+        try:
+            raw = self._client.get(self.prefix + key)
+        except self._errors:
+            self._failed('generation')
+            return None
+        return int(raw) if raw is not None else 0
+
+
+CacheBackend = Union[MemoryCache, RedisCache]
+
+
+# ---- Read-through para items -------------------------------------------------
+
+GENERATION_KEY = 'gen'
+
+
+class ItemCache:
+    """Read-through em volta de repository.get_item_row/list_item_rows/get_list_version.
+
+    Guarda `ItemOut` (nunca objetos ligados a uma Session) e o ETag de
+    listagem por filtro (str), que custa um scan do filtro. As chaves
+    levam a geração atual: cada escrita a incrementa e tudo o que foi cacheado
+    antes deixa de ser encontrado (e sai pelo TTL/LRU), sem enumerar chaves. A
+    geração é lida antes da consulta, então uma leitura concorrente com uma
+    escrita grava na geração antiga e nunca publica dado velho.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend]) -> None:
+        self.backend = backend
+
+    # Chaves; None = geração indisponível (backend com falha): não lê nem grava
+    def _item_key(self, id: uuid.UUID) -> str | None:
+        assert self.backend is not None
+        gen = self.backend.generation(GENERATION_KEY)
+        return None if gen is None else f'item:{gen}:{id}'
+
+    def _list_key(self, limit: int, offset: int, status: Status | None, cursor: str | None) -> str | None:
+        assert self.backend is not None
+        gen = self.backend.generation(GENERATION_KEY)
+        return None if gen is None else f'list:{gen}:{status.value if status else ""}:{limit}:{offset}:{cursor or ""}'
+
+    def _version_key(self, status: Status | None) -> tuple[int | None, str | None]:
+        assert self.backend is not None
+        gen = self.backend.generation(GENERATION_KEY)
+        return gen, None if gen is None else f'version:{gen}:{status.value if status else ""}'
+
+    def _lookup(self, kind: str, key: str | None) -> Any | None:
+        assert self.backend is not None
+        value = None if key is None else self.backend.get(key)
+        if value is None:
+            cache_misses_total.labels(backend=self.backend.name, kind=kind).inc()
+        else:
+            cache_hits_total.labels(backend=self.backend.name, kind=kind).inc()
+        return value
+
+    def _store(self, key: str | None, value: Any) -> None:
+        assert self.backend is not None
+        if key is not None:
+            self.backend.set(key, value)
+
+    # Sync
+    def get_item(self, session: Session, id: uuid.UUID) -> ItemOut | Row | None:
+        if self.backend is None:
+            return repository.get_item_row(session, id)
+        key = self._item_key(id)
+        cached = self._lookup('item', key)
+        if cached is not None:
+            return cached
+        row = repository.get_item_row(session, id)
+        if row is None:
+            return None
+        item = ItemOut.model_validate(row)
+        self._store(key, item)
+        return item
+
+    def list_items(
+        self,
+        session: Session,
+        limit: int = 50,
+        offset: int = 0,
+        status: Status | None = None,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> Sequence[ItemOut] | Sequence[Row]:
+        """Com `fields`: usa a página completa se já estiver no cache; senão vai
+        ao banco só com as colunas pedidas e não grava (o cache guarda ItemOut)."""
+        if self.backend is None:
+            return repository.list_item_rows(session, limit=limit, offset=offset, status=status, cursor=cursor, fields=fields)
+        key = self._list_key(limit, offset, status, cursor)
+        cached = self._lookup('list', key)
+        if cached is not None:
+            return cached
+        if fields is not None:
+            return repository.list_item_rows(session, limit=limit, offset=offset, status=status, cursor=cursor, fields=fields)
+        items = [ItemOut.model_validate(o) for o in repository.list_item_rows(
+            session, limit=limit, offset=offset, status=status, cursor=cursor)]
+        self._store(key, items)
+        return items
+
+    def list_etag(self, session: Session, status: Status | None = None) -> str:
+        if self.backend is None:
+            return list_etag(status, *repository.get_list_version(session, status))
+        gen, key = self._version_key(status)
+        cached = self._lookup('version', key)
+        if cached is not None:
+            return cached
+        etag = list_etag(status, *repository.get_list_version(session, status), generation=gen)
+        self._store(key, etag)
+        return etag
+
+    def invalidate(self) -> None:
+        """Chamado após create/update/delete: avança a geração (item e páginas)."""
+        # Leituras que começarem agora não se juntam a consultas anteriores à escrita
+        list_flight.forget()
+        list_flight_async.forget()
+        if self.backend is None:
+            return
+        # A escrita já foi commitada: falha aqui não pode virar erro da requisição
+        if self.backend.incr(GENERATION_KEY) is None:
+            logger.warning('Cache não invalidado após escrita; leituras podem ver dado antigo até o TTL')
+
+    # Async (DB_ASYNC=true); backends bloqueantes vão para o threadpool
+    async def _call(self, fn, *args):  # type: ignore[no-untyped-def]
+        assert self.backend is not None
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def get_item_async(self, session: AsyncSession, id: uuid.UUID) -> ItemOut | Row | None:
+        if self.backend is None:
+            return await repository_async.get_item_row(session, id)
+        key = await self._call(self._item_key, id)
+        cached = await self._call(self._lookup, 'item', key)
+        if cached is not None:
+            return cached
+        row = await repository_async.get_item_row(session, id)
+        if row is None:
+            return None
+        item = ItemOut.model_validate(row)
+        await self._call(self._store, key, item)
+        return item
+
+    async def list_items_async(
+        self,
+        session: AsyncSession,
+        limit: int = 50,
+        offset: int = 0,
+        status: Status | None = None,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> Sequence[ItemOut] | Sequence[Row]:
+        if self.backend is None:
+            return await repository_async.list_item_rows(
+                session, limit=limit, offset=offset, status=status, cursor=cursor, fields=fields)
+        key = await self._call(self._list_key, limit, offset, status, cursor)
+        cached = await self._call(self._lookup, 'list', key)
+        if cached is not None:
+            return cached
+        if fields is not None:
+            return await repository_async.list_item_rows(
+                session, limit=limit, offset=offset, status=status, cursor=cursor, fields=fields)
+        items = [ItemOut.model_validate(o) for o in await repository_async.list_item_rows(
+            session, limit=limit, offset=offset, status=status, cursor=cursor)]
+        await self._call(self._store, key, items)
+        return items
+
+    async def list_etag_async(self, session: AsyncSession, status: Status | None = None) -> str:
+        if self.backend is None:
+            return list_etag(status, *await repository_async.get_list_version(session, status))
+        gen, key = await self._call(self._version_key, status)
+        cached = await self._call(self._lookup, 'version', key)
+        if cached is not None:
+            return cached
+        etag = list_etag(status, *await repository_async.get_list_version(session, status), generation=gen)
+        await self._call(self._store, key, etag)
+        return etag
+
+    async def invalidate_async(self) -> None:
+        if self.backend is None:
+            self.invalidate()
+            return
+        await self._call(self.invalidate)
+
+
+def build_item_cache(settings: Settings) -> ItemCache:
+    if settings.CACHE_BACKEND == 'memory':
+        return ItemCache(MemoryCache(settings.CACHE_TTL_SECONDS, settings.CACHE_MAX_ENTRIES))
+    if settings.CACHE_BACKEND == 'redis':
+        return ItemCache(RedisCache(settings.CACHE_REDIS_URL, settings.CACHE_TTL_SECONDS))
+    return ItemCache(None)
+
+
+item_cache = build_item_cache(get_settings())
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import Engine, Row, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .metrics import changes_dropped_subscribers_total, changes_events_total, changes_subscribers
+
+# Feed de mudanças: cada escrita do repository publica, na mesma transação,
+# um evento compacto por linha ({seq, id, op, status, updated_at}) com
+# pg_notify. O Postgres só entrega no commit (rollback não publica nada) e na
+# ordem dos commits. Cada processo mantém UMA conexão em LISTEN (ChangeHub) e
+# repassa os eventos às conexões SSE de GET /items/changes.
+
+CHANNEL = 'items_changes'
+
+# Um round trip para N linhas: o seq vem de item_change_seq (models.ITEM_CHANGE_SEQ)
+PUBLISH_STMT = text(
+    "SELECT pg_notify(:channel, (jsonb_build_object('seq', nextval('item_change_seq')) || e::jsonb)::text) "
+    "FROM unnest(CAST(:events AS text[])) AS e"
+).bindparams(channel=CHANNEL)
+
+RETRY_FRAME = b'retry: 3000\n\n'
+PING_FRAME = b': ping\n\n'
+# O cliente perdeu eventos (cursor fora do buffer, fila cheia ou LISTEN
+# reconectado): deve recarregar a lista e seguir do próximo evento
+RESET_FRAME = b'event: reset\ndata: {}\n\n'
+
+
+def change_events(op: str, rows: Iterable[Row]) -> list[str]:
+    """Payloads JSON (sem o seq) para as linhas retornadas por um INSERT/UPDATE/DELETE ... RETURNING."""
+    events = []
+    for row in rows:
+        updated_at = getattr(row, 'updated_at', None)
+        events.append(json.dumps({
+            'id': str(row.id),
+            'op': op,
+            'status': row.status.value,
+            'updated_at': updated_at.isoformat() if updated_at is not None else None,
+        }, separators=(',', ':')))
+    return events
+
+
+# Desligado por check_change_seq quando item_change_seq não existe (schema de
+# migração sem a sequence): sem isso, o nextval do PUBLISH_STMT derrubaria toda escrita
+_seq_available = True
+
+
+def check_change_seq(bind: Engine) -> bool:
+    """Confere no startup se item_change_seq existe; se não, desliga publicação e feed com um aviso."""
+    global _seq_available
+    if bind.dialect.name != 'postgresql':
+        return _seq_available
+    log = logging.getLogger(__name__)
+    try:
+        with bind.connect() as conn:
+            _seq_available = conn.execute(text("SELECT to_regclass('item_change_seq') IS NOT NULL")).scalar_one()
+    except Exception:
+        # Banco fora no startup: não bloqueia; as escritas falhariam de qualquer jeito
+        log.warning('Não foi possível verificar item_change_seq', exc_info=True)
+        return _seq_available
+    if not _seq_available:
+        log.warning(
+            'Sequence item_change_seq ausente: feed de mudanças desligado (crie-a na migração '
+            'ou rode com DB_CREATE_SCHEMA=true)'
+        )
+    return _seq_available
+
+
+def publish_enabled(dialect: str) -> bool:
+    return get_settings().CHANGE_EVENTS_ENABLED and _seq_available and dialect == 'postgresql'
+
+
+def publish(session: Session, op: str, rows: Sequence[Row]) -> None:
+    """pg_notify dos eventos de `rows`; chamar antes do commit da escrita."""
+    if rows and publish_enabled(session.get_bind().dialect.name):
+        session.execute(PUBLISH_STMT, {'events': change_events(op, rows)})
+
+
+async def publish_async(session: AsyncSession, op: str, rows: Sequence[Row]) -> None:
+    if rows and publish_enabled(session.get_bind().dialect.name):
+        await session.execute(PUBLISH_STMT, {'events': change_events(op, rows)})
+
+
+class _Subscriber:
+    __slots__ = ('queue',)
+
+    def __init__(self, maxsize: int) -> None:
+        # None encerra o stream
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=maxsize)
+
+
+class ChangeHub:
+    """Fan-out de uma conexão LISTEN para N assinantes SSE do processo.
+
+    Cada NOTIFY vira um frame SSE serializado uma única vez e é enfileirado
+    para todos os assinantes (put_nowait, sem await por assinante). Os últimos
+    `buffer_size` frames ficam num ring buffer para retomar pelo cursor (id
+    do evento). Assinante com a fila cheia recebe `reset` e é desconectado,
+    em vez de acumular memória ou atrasar os outros.
+    """
+
+    def __init__(self, buffer_size: int = 10000, queue_size: int = 1000, heartbeat: float = 15.0) -> None:
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._buffer: deque[tuple[int, bytes]] = deque(maxlen=buffer_size)
+        self._subscribers: set[_Subscriber] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._conninfo: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, database_url: str) -> None:
+        """Inicia o LISTEN em background (não bloqueia o startup se o banco estiver fora)."""
+        if self.running:
+            return
+        # psycopg não entende o prefixo do dialeto (postgresql+psycopg://)
+        self._conninfo = make_url(database_url).set(drivername='postgresql').render_as_string(hide_password=False)
+        self._task = asyncio.create_task(self._listen(), name='changes-listen')
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for sub in list(self._subscribers):
+            self._close(sub, None)
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        log = logging.getLogger(__name__)
+        backoff = 0.5
+        connected_before = False
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(self._conninfo, autocommit=True)
+                async with conn:
+                    await conn.execute(f'LISTEN {CHANNEL}')
+                    if connected_before:
+                        # Eventos do intervalo sem LISTEN se perderam: o buffer não
+                        # serve mais para retomar e quem está conectado precisa recarregar
+                        log.warning('LISTEN %s reconectado; enviando reset aos assinantes', CHANNEL)
+                        self._buffer.clear()
+                        for sub in list(self._subscribers):
+                            self._close(sub, 'reconnect', RESET_FRAME)
+                    connected_before = True
+                    backoff = 0.5
+                    async for notify in conn.notifies():
+                        self._dispatch(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.warning('LISTEN %s falhou; nova tentativa em %.1fs', CHANNEL, backoff, exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _dispatch(self, payload: str) -> None:
+        seq = json.loads(payload)['seq']
+        frame = f'id: {seq}\nevent: change\ndata: {payload}\n\n'.encode()
+        self._buffer.append((seq, frame))
+        changes_events_total.inc()
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._close(sub, 'lagging', RESET_FRAME)
+
+    def _close(self, sub: _Subscriber, reason: str | None, last: bytes | None = None) -> None:
+        self._subscribers.discard(sub)
+        if reason is not None:
+            changes_dropped_subscribers_total.labels(reason=reason).inc()
+        # Descarta o que não foi lido: o frame final e o fim do stream precisam caber
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        if last is not None:
+            sub.queue.put_nowait(last)
+        sub.queue.put_nowait(None)
+
+    def _backlog(self, cursor: int | None) -> list[bytes]:
+        if cursor is None:
+            return []
+        frames = []
+        found = False
+        for seq, frame in self._buffer:
+            if found:
+                frames.append(frame)
+            elif seq == cursor:
+                found = True
+        if not found:
+            # Mais antigo que o buffer (ou de antes de um reset): não dá para garantir continuidade
+            return [RESET_FRAME]
+        return frames
+
+    async def stream(self, cursor: int | None = None) -> AsyncIterator[bytes]:
+        """Frames SSE: o que veio depois de `cursor` no buffer e, em seguida, os eventos ao vivo."""
+        # Snapshot do buffer e inscrição sem await entre eles: nada se perde nem duplica
+        sub = _Subscriber(self.queue_size)
+        backlog = self._backlog(cursor)
+        self._subscribers.add(sub)
+        changes_subscribers.inc()
+        try:
+            yield RETRY_FRAME
+            for frame in backlog:
+                yield frame
+            while True:
+                try:
+                    item = await asyncio.wait_for(sub.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Mantém proxies/load balancers sem fechar a conexão ociosa
+                    yield PING_FRAME
+                    continue
+                if item is None:
+                    return
+                yield item
+        finally:
+            self._subscribers.discard(sub)
+            changes_subscribers.dec()
+
+
+def changes_available(database_url: str) -> bool:
+    return get_settings().CHANGE_EVENTS_ENABLED and _seq_available and make_url(database_url).get_backend_name() == 'postgresql'
+
+
+_settings = get_settings()
+change_hub = ChangeHub(
+    buffer_size=_settings.CHANGES_BUFFER_SIZE,
+    queue_size=_settings.CHANGES_QUEUE_SIZE,
+    heartbeat=_settings.CHANGES_HEARTBEAT_SECONDS,
+)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import zlib
+from typing import Protocol
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover - optional at runtime
+    brotli = None  # type: ignore
+
+# Streams que o cliente consome evento a evento (SSE): comprimir só atrasaria
+DEFAULT_EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: str, brotli_available: bool = True) -> str | None:
+    """Escolhe br ou gzip pelo Accept-Encoding (com q-values); None = sem compressão.
+
+    Em empate br vence: menor que gzip no mesmo custo de CPU para JSON.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+    wildcard = weights.get('*', 0.0)
+    candidates = ('br', 'gzip') if brotli_available else ('gzip',)
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Encoder(Protocol):
+    def compress(self, body: bytes, more_body: bool) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        # wbits 16 + 15: container gzip (não zlib cru)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        out = self._compressor.compress(body)
+        # Z_SYNC_FLUSH a cada bloco de streaming: o cliente decodifica sem esperar o fim
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        # mode=TEXT: dica para o encoder (JSON, NDJSON, CSV)
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        out = self._compressor.process(body)
+        return out + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """gzip/br negociado pelo Accept-Encoding, em ASGI puro.
+
+    Não depende de internals do Starlette: só Headers/MutableHeaders. Corpos
+    menores que `minimum_size` (numa única mensagem) saem sem compressão;
+    respostas que já têm Content-Encoding (ex.: /metrics) e tipos em
+    `exclude_content_types` (SSE) passam direto. Streaming é comprimido bloco a
+    bloco com flush; blocos a partir de `thread_minimum_size` são comprimidos
+    fora do event loop. Brotli exige o pacote `brotli`; sem ele, só gzip.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        brotli_quality: int = 4,
+        thread_minimum_size: int = 128 * 1024,
+        exclude_content_types: tuple[str, ...] = DEFAULT_EXCLUDED_CONTENT_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.brotli_quality = brotli_quality
+        self.thread_minimum_size = thread_minimum_size
+        self.exclude_content_types = exclude_content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), brotli is not None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder: _Encoder | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or headers.get("content-type", "").startswith(
+                    self.exclude_content_types
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Segura o start até ver o primeiro bloco do corpo
+                    start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if encoder is None:
+                assert start is not None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = self._encoder(encoding)
+                headers = MutableHeaders(raw=list(start["headers"]))
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+                body = await self._compress(encoder, body, more_body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(body))
+                await send({**start, "headers": headers.raw})
+            else:
+                body = await self._compress(encoder, body, more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _encoder(self, encoding: str) -> _Encoder:
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.compresslevel)
+
+    async def _compress(self, encoder: _Encoder, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            return await anyio.to_thread.run_sync(encoder.compress, body, more_body)
+        return encoder.compress(body, more_body)
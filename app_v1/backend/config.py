@@ -8,9 +8,7 @@ from dotenv import load_dotenv
 import os
 
 
-
-# Tenta carregar .env da raiz do projeto e da pasta backend, mas não exige
-from pathlib import Path
+# Tenta carregar .env da raiz do projeto e da pasta backend, mas não exige (uma vez, no import)
 base_dir = Path(__file__).resolve().parent.parent.parent.parent
 env_root = base_dir / '.env'
 env_backend = Path(__file__).resolve().parent / '.env'
@@ -25,6 +23,73 @@ class Settings:
         self.DATABASE_URL: Optional[str] = os.getenv('DATABASE_URL')
         self.API_HOST: str = os.getenv('API_HOST', '127.0.0.1')
         self.API_PORT: int = int(os.getenv('API_PORT', '8000'))
+        # Modo async (AsyncSession + handlers async def); opt-in
+        self.DB_ASYNC: bool = os.getenv('DB_ASYNC', 'false').lower() == 'true'
+        # Pool de conexões (por processo); tamanho padrão = 5+10 do SQLAlchemy
+        self.DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '5'))
+        self.DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+        self.DB_POOL_TIMEOUT: float = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        self.DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+        # Conexões que o pod inteiro pode abrir (todos os workers); vazio = sem teto
+        budget = os.getenv('DB_CONNECTION_BUDGET')
+        self.DB_CONNECTION_BUDGET: Optional[int] = int(budget) if budget else None
+        # Workers do Gunicorn (exportado por backend/gunicorn_conf.py)
+        self.WEB_CONCURRENCY: int = int(os.getenv('WEB_CONCURRENCY', '1'))
+        # always: SELECT 1 a cada checkout; never: confia em DB_POOL_RECYCLE + invalidação no erro
+        self.DB_POOL_PRE_PING: str = os.getenv('DB_POOL_PRE_PING', 'always').lower()
+        if self.DB_POOL_PRE_PING not in ('always', 'never'):
+            raise RuntimeError('DB_POOL_PRE_PING deve ser "always" ou "never".')
+        # Leituras serializadas direto de Row -> JSON (orjson), sem validar ItemOut por linha
+        self.FAST_JSON: bool = os.getenv('FAST_JSON', 'false').lower() == 'true'
+        # Compressão negociada (br se o pacote brotli existir, senão gzip) acima do limiar
+        self.COMPRESSION_ENABLED: bool = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+        self.COMPRESSION_MIN_BYTES: int = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+        self.COMPRESSION_GZIP_LEVEL: int = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+        self.COMPRESSION_BROTLI_QUALITY: int = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+        # create_all + ensure_columns + ensure_indexes no startup (didático); false quando o schema vem de migrações
+        self.DB_CREATE_SCHEMA: bool = os.getenv('DB_CREATE_SCHEMA', 'true').lower() == 'true'
+        # ensure_columns só adiciona colunas geradas STORED (reescrevem a tabela sob lock exclusivo) se true
+        self.DB_ADD_GENERATED_COLUMNS: bool = os.getenv('DB_ADD_GENERATED_COLUMNS', 'false').lower() == 'true'
+        # Máximo de operações por requisição em /items:batch
+        self.BATCH_MAX_ITEMS: int = int(os.getenv('BATCH_MAX_ITEMS', '1000'))
+        # Leituras idênticas concorrentes de GET /items compartilham uma consulta em andamento
+        self.SINGLE_FLIGHT_ENABLED: bool = os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+        # Cache read-through de GET /items e /items/{id}: none | memory | redis
+        self.CACHE_BACKEND: str = os.getenv('CACHE_BACKEND', 'none').lower()
+        self.CACHE_TTL_SECONDS: float = float(os.getenv('CACHE_TTL_SECONDS', '5'))
+        self.CACHE_MAX_ENTRIES: int = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+        self.CACHE_REDIS_URL: str = os.getenv('CACHE_REDIS_URL', 'redis://redis:6379/0')
+        # ETag em GET /items: max(updated_at) + count varre o filtro; sem cache isso
+        # roda a cada requisição, então o padrão só liga quando há cache
+        self.LIST_ETAG: bool = os.getenv('LIST_ETAG', 'false' if self.CACHE_BACKEND == 'none' else 'true').lower() == 'true'
+        # Feed de mudanças (GET /items/changes): pg_notify na transação de cada
+        # escrita; o NOTIFY serializa os commits, então false desliga em cargas de escrita pesadas
+        self.CHANGE_EVENTS_ENABLED: bool = os.getenv('CHANGE_EVENTS_ENABLED', 'true').lower() == 'true'
+        # Eventos guardados por processo para retomar pelo Last-Event-ID
+        self.CHANGES_BUFFER_SIZE: int = int(os.getenv('CHANGES_BUFFER_SIZE', '10000'))
+        # Fila por assinante; cheia = cliente lento, recebe reset e é desconectado
+        self.CHANGES_QUEUE_SIZE: int = int(os.getenv('CHANGES_QUEUE_SIZE', '1000'))
+        self.CHANGES_HEARTBEAT_SECONDS: float = float(os.getenv('CHANGES_HEARTBEAT_SECONDS', '15'))
+        # Admission control: limite de concorrência adaptativo por processo, 503 + Retry-After acima dele
+        self.ADMISSION_ENABLED: bool = os.getenv('ADMISSION_ENABLED', 'false').lower() == 'true'
+        self.ADMISSION_READ_LIMIT: int = int(os.getenv('ADMISSION_READ_LIMIT', '20'))
+        self.ADMISSION_WRITE_LIMIT: int = int(os.getenv('ADMISSION_WRITE_LIMIT', '10'))
+        self.ADMISSION_MIN_LIMIT: int = int(os.getenv('ADMISSION_MIN_LIMIT', '4'))
+        self.ADMISSION_MAX_LIMIT: int = int(os.getenv('ADMISSION_MAX_LIMIT', '100'))
+        # Quanto a latência recente pode passar da latência de referência antes de o limite encolher
+        self.ADMISSION_LATENCY_TOLERANCE: float = float(os.getenv('ADMISSION_LATENCY_TOLERANCE', '2.0'))
+        self.ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', '1'))
+        self.ADMISSION_EXEMPT_PATHS: list[str] = [
+            p.strip() for p in os.getenv(
+                'ADMISSION_EXEMPT_PATHS', '/metrics,/docs,/redoc,/openapi.json,/items/changes,/items/export'
+            ).split(',') if p.strip()
+        ]
+        # ObservabilityMiddleware: métricas HTTP, access log e header de correlação
+        self.METRICS_ENABLED: bool = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+        self.ACCESS_LOG_ENABLED: bool = os.getenv('ACCESS_LOG_ENABLED', 'true').lower() == 'true'
+        self.REQUEST_ID_HEADER: str = os.getenv('REQUEST_ID_HEADER', 'X-Request-ID')
+        if self.CACHE_BACKEND not in ('none', 'memory', 'redis'):
+            raise RuntimeError('CACHE_BACKEND deve ser "none", "memory" ou "redis".')
         if not self.DATABASE_URL:
             raise RuntimeError('DATABASE_URL não definido. Configure via variável de ambiente ou .env.')
 
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import Connection, Engine, text
+
+# Contadores por status em item_status_counts (ItemStatusCountORM), mantidos por
+# triggers de statement com transition tables: um INSERT/UPDATE/DELETE de N
+# linhas (inclusive /items:batch e cargas via SQL) custa um upsert por status,
+# na mesma transação da escrita. Só Postgres; em outros bancos as contagens
+# caem para COUNT(*) (repository.build_status_counts_stmt).
+
+COUNTER_SHARDS = 16
+
+# Só leia item_status_counts com os triggers no lugar: com DB_CREATE_SCHEMA=false
+# a tabela pode vir de uma migração sem eles, e as contagens ficariam paradas.
+# Definido no startup por check_status_counters; até lá, COUNT(*).
+_counters_active = False
+
+TRIGGERS = {
+    'items_status_counts_ins': 'AFTER INSERT ON items REFERENCING NEW TABLE AS new_rows',
+    'items_status_counts_del': 'AFTER DELETE ON items REFERENCING OLD TABLE AS old_rows',
+    'items_status_counts_upd': 'AFTER UPDATE ON items REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'items_status_counts_trunc': 'AFTER TRUNCATE ON items',
+}
+
+UPSERT = "ON CONFLICT (status, shard) DO UPDATE SET count = c.count + EXCLUDED.count"
+
+# Um statement por TG_OP: cada trigger só enxerga as transition tables que declarou
+FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION items_status_counts_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    s smallint := pg_backend_pid() % {COUNTER_SHARDS};
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO item_status_counts AS c (status, shard, count)
+        SELECT status, s, count(*) FROM new_rows GROUP BY status
+        {UPSERT};
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO item_status_counts AS c (status, shard, count)
+        SELECT status, s, -count(*) FROM old_rows GROUP BY status
+        {UPSERT};
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO item_status_counts AS c (status, shard, count)
+        SELECT d.status, s, sum(d.delta) FROM (
+            SELECT status, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT status, -1 FROM old_rows
+        ) d
+        GROUP BY d.status
+        -- UPDATE que não muda status soma 0: não toca (nem trava) a linha do contador
+        HAVING sum(d.delta) <> 0
+        {UPSERT};
+    ELSE
+        DELETE FROM item_status_counts;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _installed(conn: Connection) -> set[str]:
+    # to_regclass: sem a tabela items, nenhum trigger (em vez de erro)
+    return set(conn.execute(text(
+        "SELECT tgname FROM pg_trigger WHERE tgrelid = to_regclass('items') AND NOT tgisinternal"
+    )).scalars()) & set(TRIGGERS)
+
+
+def counters_active() -> bool:
+    return _counters_active
+
+
+def check_status_counters(bind: Engine) -> bool:
+    """Liga a leitura de item_status_counts se todos os triggers estão instalados.
+
+    Sem eles (ou sem acesso ao banco no startup), /items/stats e X-Total-Count
+    usam COUNT(*) ... GROUP BY: mais caro, mas correto.
+    """
+    global _counters_active
+    _counters_active = False
+    if bind.dialect.name != 'postgresql':
+        return False
+    log = logging.getLogger(__name__)
+    try:
+        with bind.connect() as conn:
+            missing = set(TRIGGERS) - _installed(conn)
+    except Exception:
+        log.warning('Não foi possível verificar os triggers de item_status_counts; contagens via COUNT(*)', exc_info=True)
+        return False
+    if missing:
+        log.warning(
+            'Triggers de item_status_counts ausentes (%s); contagens via COUNT(*). '
+            'Rode com DB_CREATE_SCHEMA=true ou aplique counters.FUNCTION_SQL/TRIGGERS na migração',
+            ', '.join(sorted(missing)),
+        )
+        return False
+    _counters_active = True
+    return True
+
+
+def ensure_status_counters(bind: Engine) -> None:
+    """Instala função + triggers e preenche item_status_counts a partir de items.
+
+    Idempotente. Quando falta algum trigger, trava items contra escritas
+    (SHARE ROW EXCLUSIVE, que também serializa réplicas subindo juntas), recria
+    os triggers e recalcula as contagens com um único COUNT(*) ... GROUP BY.
+    A tabela item_status_counts vem do create_all (ou da migração).
+    """
+    if bind.dialect.name != 'postgresql':
+        return
+    log = logging.getLogger(__name__)
+    expected = set(TRIGGERS)
+
+    with bind.connect() as conn:
+        if _installed(conn) == expected:
+            return
+    with bind.begin() as conn:
+        conn.execute(text('LOCK TABLE items IN SHARE ROW EXCLUSIVE MODE'))
+        if _installed(conn) == expected:
+            return
+        log.warning('Instalando contadores por status (item_status_counts)')
+        conn.execute(text(FUNCTION_SQL))
+        for name, timing in TRIGGERS.items():
+            conn.execute(text(f'DROP TRIGGER IF EXISTS {name} ON items'))
+            conn.execute(text(
+                f'CREATE TRIGGER {name} {timing} FOR EACH STATEMENT EXECUTE FUNCTION items_status_counts_apply()'
+            ))
+        conn.execute(text('DELETE FROM item_status_counts'))
+        conn.execute(text(
+            'INSERT INTO item_status_counts (status, shard, count) '
+            'SELECT status, 0, count(*) FROM items GROUP BY status'
+        ))
@@ -1,22 +1,214 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+import threading
+from collections.abc import AsyncGenerator, Generator, Iterator
+from contextlib import contextmanager
+from typing import Any
 
-from .config import get_settings
+from sqlalchemy import Engine, create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateColumn, CreateIndex, MetaData
+
+from .config import Settings, get_settings
+from .metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_pool
 
 settings = get_settings()
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
-# Dependência para FastAPI
-from collections.abc import Generator
-from sqlalchemy.orm import Session
+def pool_limits(settings: Settings) -> tuple[int, int]:
+    """(pool_size, max_overflow) de cada engine deste processo.
+
+    Com DB_CONNECTION_BUDGET, o orçamento é dividido entre WEB_CONCURRENCY workers e
+    as engines do processo (sync + async com DB_ASYNC), e DB_POOL_SIZE/DB_MAX_OVERFLOW
+    viram só o teto: workers x (engines x (pool_size + max_overflow) + listen) <= orçamento,
+    onde listen é a conexão LISTEN do feed de mudanças (1 no Postgres com
+    CHANGE_EVENTS_ENABLED, fora do pool).
+    """
+    if settings.DB_CONNECTION_BUDGET is None:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    engines = 2 if settings.DB_ASYNC else 1
+    listen = int(settings.CHANGE_EVENTS_ENABLED and make_url(settings.DATABASE_URL).get_backend_name() == 'postgresql')
+    per_engine = (settings.DB_CONNECTION_BUDGET // settings.WEB_CONCURRENCY - listen) // engines
+    if per_engine < 1:
+        raise RuntimeError(
+            f'DB_CONNECTION_BUDGET={settings.DB_CONNECTION_BUDGET} não cobre '
+            f'{settings.WEB_CONCURRENCY} workers x ({engines} engine(s) + {listen} LISTEN).'
+        )
+    pool_size = min(settings.DB_POOL_SIZE, per_engine)
+    return pool_size, min(settings.DB_MAX_OVERFLOW, per_engine - pool_size)
+
+
+POOL_SIZE, MAX_OVERFLOW = pool_limits(settings)
+POOL_KWARGS = dict(
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING == 'always',
+)
+
+# Engines criadas no primeiro uso: importar backend.main não resolve DNS nem monta pools
+_engine: Engine | None = None
+_async_engine: AsyncEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                new = create_engine(settings.DATABASE_URL, poolclass=TimedQueuePool, **POOL_KWARGS)
+                instrument_pool(new.pool, 'sync')
+                _engine = new
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    # Engine async só existe com DB_ASYNC=true (postgresql+psycopg serve aos dois modos)
+    global _async_engine
+    assert settings.DB_ASYNC, 'DB_ASYNC desativado'
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                new = create_async_engine(settings.DATABASE_URL, poolclass=TimedAsyncAdaptedQueuePool, **POOL_KWARGS)
+                instrument_pool(new.sync_engine.pool, 'async')
+                _async_engine = new
+    return _async_engine
+
+
+def __getattr__(name: str) -> Any:
+    # Compatibilidade: `from backend.db import engine` cria a engine nesse momento
+    if name == 'engine':
+        return get_engine()
+    if name == 'async_engine':
+        return get_async_engine() if settings.DB_ASYNC else None
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw: Any) -> Session:
+        local_kw.setdefault('bind', get_engine())
+        return super().__call__(**local_kw)
+
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        local_kw.setdefault('bind', get_async_engine())
+        return super().__call__(**local_kw)
 
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = _LazyAsyncSessionmaker(autoflush=False) if settings.DB_ASYNC else None
+
+# Dependência para FastAPI
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    assert AsyncSessionLocal is not None, 'DB_ASYNC desativado'
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Chave do pg_advisory_lock que serializa o setup de schema entre workers e réplicas
+SCHEMA_LOCK_KEY = 7_465_713_001
+
+
+@contextmanager
+def schema_setup_lock(bind: Engine) -> Iterator[bool]:
+    """Serializa o setup de schema do startup entre workers e réplicas.
+
+    No Postgres segura um `pg_advisory_lock` numa conexão própria (fora do pool,
+    que pode ter uma conexão só) e rende True só para quem o pegou livre: esse
+    processo roda create_all/ensure_*. Quem chega enquanto ele roda espera o
+    lock ser solto e recebe False, pulando o setup em vez de disputar os mesmos
+    CREATE/ALTER. Fora do Postgres rende sempre True.
+    """
+    if bind.dialect.name != 'postgresql':
+        yield True
+        return
+    lock_engine = create_engine(bind.url, poolclass=NullPool)
+    try:
+        with lock_engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            params = {'key': SCHEMA_LOCK_KEY}
+            first = bool(conn.execute(text('SELECT pg_try_advisory_lock(:key)'), params).scalar())
+            if not first:
+                logging.getLogger(__name__).info('Aguardando setup de schema de outro processo')
+                conn.execute(text('SELECT pg_advisory_lock(:key)'), params)
+            try:
+                yield first
+            finally:
+                conn.execute(text('SELECT pg_advisory_unlock(:key)'), params)
+    finally:
+        lock_engine.dispose()
+
+def ensure_columns(bind: Engine, metadata: MetaData, add_generated: bool = False) -> None:
+    """Adiciona colunas declaradas nos modelos que faltam em tabelas já criadas.
+
+    Como `ensure_indexes`, cobre o que `create_all` não faz em bancos existentes,
+    mas só para colunas que não precisam de valor nas linhas antigas (anuláveis ou
+    geradas). Coluna gerada STORED reescreve a tabela sob ACCESS EXCLUSIVE, então
+    só é adicionada com `add_generated` (DB_ADD_GENERATED_COLUMNS); sem ele, fica
+    um aviso e a migração, de preferência em janela de manutenção.
+    """
+    log = logging.getLogger(__name__)
+    inspector = inspect(bind)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not (column.nullable or column.computed is not None):
+                continue
+            if column.info.get('postgresql_only') and bind.dialect.name != 'postgresql':
+                continue
+            if column.computed is not None and not add_generated:
+                log.warning(
+                    'Coluna gerada %s.%s ausente; aplique a migração ou suba com DB_ADD_GENERATED_COLUMNS=true',
+                    table.name, column.name,
+                )
+                continue
+            ddl = str(CreateColumn(column).compile(dialect=bind.dialect))
+            log.warning('Adicionando coluna %s.%s', table.name, column.name)
+            try:
+                with bind.begin() as conn:
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+            except Exception:
+                # Ex.: lock_timeout ou coluna criada por fora; não impede o boot
+                log.warning('Falha ao adicionar coluna %s.%s', table.name, column.name, exc_info=True)
+
+def ensure_indexes(bind: Engine, metadata: MetaData) -> None:
+    """Cria índices declarados nos modelos que ainda não existem em tabelas já criadas.
+
+    `create_all` só cria índices junto com a tabela; em bancos existentes eles nunca
+    aparecem. No Postgres usa CREATE INDEX CONCURRENTLY (sem bloquear escritas) em
+    autocommit e recria índices deixados INVALID por uma tentativa interrompida.
+    """
+    log = logging.getLogger(__name__)
+    indexes = [idx for table in metadata.sorted_tables for idx in table.indexes]
+    if bind.dialect.name != 'postgresql':
+        for idx in indexes:
+            idx.create(bind=bind, checkfirst=True)
+        return
+    with bind.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        invalid = set(conn.execute(text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid"
+        )).scalars())
+        for idx in indexes:
+            try:
+                if idx.name in invalid:
+                    conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{idx.name}"'))
+                ddl = str(CreateIndex(idx, if_not_exists=True).compile(dialect=bind.dialect))
+                conn.execute(text(ddl.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1)))
+            except Exception:
+                # Outra réplica pode estar criando o mesmo índice; não impede o boot
+                log.warning('Falha ao criar índice %s', idx.name, exc_info=True)
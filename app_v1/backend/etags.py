@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+from fastapi import Response
+
+from .enums import Status
+
+# ETags fracos (W/"..."): representam a versão do recurso, não os bytes da
+# resposta (que variam com FAST_JSON, compressão etc.).
+#
+#   item:  W/"<updated_at em µs desde a época, hex>"
+#   lista: W/"<status|all>-<max(updated_at) em µs, hex>-<count>[-g<geração do cache>]"
+#
+# O ETag do item é reversível: If-Match vira `updated_at IN (...)` no WHERE do
+# UPDATE/DELETE, sem ler a linha antes.
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_micros(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    # Aritmética inteira: float perderia o último microssegundo
+    return (ts - EPOCH) // _MICROSECOND
+
+
+def item_etag(obj: Any) -> str:
+    """ETag de um item (Row, ItemOut ou ItemORM)."""
+    return f'W/"{_to_micros(obj.updated_at):x}"'
+
+
+def list_etag(
+    status: Status | None, max_updated_at: datetime | None, count: int, generation: int | None = None,
+) -> str:
+    """ETag da listagem filtrada por `status`: muda com qualquer insert/update/delete no filtro.
+
+    max + count sozinhos podem repetir (delete seguido de insert no mesmo
+    instante); com cache, a geração que toda escrita avança entra no ETag.
+    """
+    version = _to_micros(max_updated_at) if max_updated_at is not None else 0
+    tag = f'{status.value if status else "all"}-{version:x}-{count}'
+    return f'W/"{tag}"' if generation is None else f'W/"{tag}-g{generation}"'
+
+
+def _opaque_tags(header: str) -> List[str]:
+    # Comparação fraca (RFC 9110 8.8.3.2): ignora o prefixo W/
+    tags = []
+    for part in header.split(','):
+        part = part.strip()
+        if part.startswith('W/'):
+            part = part[2:]
+        if part:
+            tags.append(part)
+    return tags
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """If-None-Match: algum dos ETags enviados (ou `*`) corresponde a `etag`?"""
+    if not header:
+        return False
+    tags = _opaque_tags(header)
+    return '*' in tags or _opaque_tags(etag)[0] in tags
+
+
+def if_match_versions(header: str | None) -> Optional[List[datetime]]:
+    """If-Match -> valores de updated_at aceitos.
+
+    None: sem pré-condição (header ausente ou `*`). Lista vazia: nenhum ETag
+    válido de item, logo a pré-condição falha para qualquer versão.
+    """
+    if not header:
+        return None
+    tags = _opaque_tags(header)
+    if '*' in tags:
+        return None
+    versions = []
+    for tag in tags:
+        try:
+            versions.append(EPOCH + int(tag.strip('"'), 16) * _MICROSECOND)
+        except (ValueError, OverflowError):
+            continue
+    return versions
+
+
+def not_modified(etag: str) -> Response:
+    """304 sem corpo: nenhuma linha é serializada."""
+    return Response(status_code=304, headers={'ETag': etag})
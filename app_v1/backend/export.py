@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterator
+from typing import Any, Dict, Sequence
+
+from sqlalchemy import Row
+
+from .db import SessionLocal
+from .enums import Status
+from .repository import iter_item_partitions
+
+CSV_FIELDS = ['id', 'title', 'description', 'status', 'created_at', 'updated_at']
+
+
+def _row_dict(row: Row) -> Dict[str, Any]:
+    return {
+        'id': str(row.id),
+        'title': row.title,
+        'description': row.description,
+        'status': row.status.value,
+        'created_at': row.created_at.isoformat(),
+        'updated_at': row.updated_at.isoformat(),
+    }
+
+
+def _ndjson_chunk(rows: Sequence[Row]) -> bytes:
+    return ''.join(json.dumps(_row_dict(r), ensure_ascii=False) + '\n' for r in rows).encode()
+
+
+def _csv_chunk(rows: Sequence[Row], header: bool) -> bytes:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(_row_dict(r) for r in rows)
+    return buf.getvalue().encode()
+
+
+def iter_export(fmt: str, status: Status | None = None, chunk_size: int = 1000) -> Iterator[bytes]:
+    """Gera o corpo do export em blocos de `chunk_size` linhas.
+
+    Abre a própria sessão: o gerador roda depois que o handler retornou (o
+    StreamingResponse o consome no threadpool), fora do ciclo de vida de get_db.
+    """
+    with SessionLocal() as session:
+        first = True
+        if fmt == 'csv':
+            for rows in iter_item_partitions(session, status, chunk_size):
+                yield _csv_chunk(rows, header=first)
+                first = False
+            if first:
+                yield _csv_chunk([], header=True)
+        else:
+            for rows in iter_item_partitions(session, status, chunk_size):
+                yield _ndjson_chunk(rows)
@@ -0,0 +1,48 @@
+"""Configuração do Gunicorn para produção (`gunicorn -c python:backend.gunicorn_conf backend.main:app`).
+
+Env vars:
+  - WEB_CONCURRENCY: número de workers (padrão: CPUs da cota do cgroup, ver server.default_workers)
+  - GUNICORN_BIND (padrão: 0.0.0.0:8000)
+  - GUNICORN_TIMEOUT / GUNICORN_GRACEFUL_TIMEOUT / GUNICORN_KEEPALIVE (segundos)
+  - PROMETHEUS_MULTIPROC_DIR: diretório das métricas compartilhadas entre workers
+    (padrão: <tmp>/items-api-prometheus); limpo a cada start do master
+
+O número de workers é exportado em WEB_CONCURRENCY para que cada worker divida
+DB_CONNECTION_BUDGET (ver db.pool_limits) sem estourar o max_connections do Postgres.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+
+from backend.server import default_workers
+
+workers = int(os.getenv('WEB_CONCURRENCY') or default_workers())
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'backend.server.ProductionUvicornWorker'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+# Sem preload: engine/pools e threads de log são criados em cada worker, nunca herdados via fork;
+# o setup de schema do lifespan roda em todos, serializado por db.schema_setup_lock
+preload_app = False
+# Logs de acesso saem do ObservabilityMiddleware (JSON); o do Gunicorn duplicaria
+accesslog = None
+
+# Precisa estar no ambiente antes de qualquer worker importar prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'items-api-prometheus'))
+
+
+def on_starting(server) -> None:  # type: ignore[no-untyped-def]
+    # Arquivos de uma execução anterior somariam contadores de processos que não existem mais
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker) -> None:  # type: ignore[no-untyped-def]
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,26 +1,56 @@
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import os
 import queue
+import random
+import sys
+import tempfile
 import threading
 import time
+import traceback
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
 
 from pythonjsonlogger import jsonlogger
 
-try:
-    from opensearchpy import OpenSearch, helpers  # type: ignore
-except Exception:  # pragma: no cover - optional at runtime
-    OpenSearch = None  # type: ignore
-    helpers = None  # type: ignore
+from .metrics import (
+    log_queue_depth,
+    log_records_dropped_total,
+    log_shipper_batch_target_bytes,
+    log_shipper_bulk_duration_seconds,
+    log_shipper_queue_depth,
+    log_shipper_records_total,
+    set_gauge_function,
+)
+
+
+def _import_opensearch() -> Any:
+    """Import opensearchpy only when OPENSEARCH_ENABLED=true (slow import, optional dep)."""
+    try:
+        from opensearchpy import OpenSearch  # type: ignore
+    except Exception:  # pragma: no cover - optional at runtime
+        return None
+    return OpenSearch
 
 
 # ---- JSON formatter -------------------------------------------------------
 
+LOG_DICT_ATTR = '_log_dict'
+
+
 class UtcIsoTimeFormatter(jsonlogger.JsonFormatter):
+    """JSON formatter; the dict built for a record is cached on it.
+
+    Every handler sharing this formatter (stdout, OpenSearch) reuses the same
+    dict instead of rebuilding it, and OpenSearch takes it via `to_dict` without
+    a JSON string round trip.
+    """
+
     def add_fields(self, log_record: Dict[str, Any], record: logging.LogRecord, message_dict: Dict[str, Any]) -> None:  # noqa: D401
         super().add_fields(log_record, record, message_dict)
         # Normalize timestamp and basic fields
@@ -32,13 +62,163 @@ class UtcIsoTimeFormatter(jsonlogger.JsonFormatter):
         # "message" already set by base class; ensure it's a string
         if 'message' in log_record and not isinstance(log_record['message'], str):
             log_record['message'] = str(log_record['message'])
+        setattr(record, LOG_DICT_ATTR, log_record)
+
+    def format(self, record: logging.LogRecord) -> str:  # noqa: D401
+        cached = getattr(record, LOG_DICT_ATTR, None)
+        if cached is not None:
+            return self.serialize_log_record(cached)
+        return super().format(record)
+
+    def to_dict(self, record: logging.LogRecord) -> Dict[str, Any]:
+        cached = getattr(record, LOG_DICT_ATTR, None)
+        if cached is None:
+            super().format(record)
+            cached = getattr(record, LOG_DICT_ATTR)
+        return cached
+
+
+# ---- Local spill (OpenSearch overflow) -------------------------------------
+
+def encode_doc(doc: Dict[str, Any]) -> bytes:
+    """One NDJSON line: the `_source` of a bulk request and a line of a spill segment."""
+    return (json.dumps(doc, default=str) + '\n').encode('utf-8')
+
+
+class SpillStore:
+    """Append-only NDJSON segments on local disk for docs OpenSearch could not take.
+
+    The active segment is `<pid>-<seq>.part`; at `segment_bytes` it is renamed to
+    `.ndjson` (sealed). Replay claims the oldest sealed segment of any process by
+    renaming it to `.replay`, so several workers can share the directory. Delivery
+    is at-least-once: a segment that fails mid-replay is shipped again later.
+    Beyond `max_bytes` on disk new docs are dropped.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._active: Any = None
+        self._active_path: Path | None = None
+        self._active_size = 0
+        self._recover()
+        self._total = sum(p.stat().st_size for p in self.directory.glob('*.ndjson'))
+
+    def _recover(self) -> None:
+        """Seal segments left open/claimed by processes that no longer exist."""
+        for path in [*self.directory.glob('*.part'), *self.directory.glob('*.replay')]:
+            # <ts>-<pid>-<seq>.part / <ts>-<pid>-<seq>.<claimer pid>.replay
+            owner = path.stem.rsplit('.', 1)[-1] if path.suffix == '.replay' else path.stem.split('-')[1]
+            if not _pid_alive(int(owner)):
+                path.rename(self.directory / (path.stem.split('.')[0] + '.ndjson'))
+
+    def append(self, line: bytes) -> bool:
+        """Append one encoded doc (see encode_doc); False when the disk budget is used up."""
+        with self._lock:
+            if self._total + len(line) > self.max_bytes:
+                return False
+            if self._active is None:
+                self._seq += 1
+                self._active_path = self.directory / f'{time.time_ns()}-{os.getpid()}-{self._seq}.part'
+                self._active = self._active_path.open('ab')
+                self._active_size = 0
+            self._active.write(line)
+            self._active_size += len(line)
+            self._total += len(line)
+            if self._active_size >= self.segment_bytes:
+                self._seal()
+            return True
+
+    def _seal(self) -> None:
+        assert self._active is not None and self._active_path is not None
+        self._active.close()
+        self._active_path.rename(self._active_path.with_suffix('.ndjson'))
+        self._active = self._active_path = None
+
+    def claim(self) -> Path | None:
+        """Oldest sealed segment, renamed to `.replay` (None when nothing to replay)."""
+        with self._lock:
+            sealed = sorted(self.directory.glob('*.ndjson'))
+            if not sealed and self._active is not None:
+                # Queue drained: the partial segment can be replayed right away
+                self._active.flush()
+                self._seal()
+                sealed = sorted(self.directory.glob('*.ndjson'))
+            for path in sealed:
+                claimed = path.with_suffix(f'.{os.getpid()}.replay')
+                try:
+                    path.rename(claimed)
+                except FileNotFoundError:  # claimed by another worker
+                    continue
+                return claimed
+        return None
+
+    @staticmethod
+    def read(path: Path) -> Iterator[bytes]:
+        with path.open('rb') as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+    def done(self, path: Path) -> None:
+        with self._lock:
+            self._total = max(self._total - path.stat().st_size, 0)
+        path.unlink()
+
+    def release(self, path: Path) -> None:
+        """Replay failed: put the segment back for a later attempt."""
+        path.rename(self.directory / (path.stem.split('.')[0] + '.ndjson'))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._seal()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _report_error(message: str) -> None:
+    """Current exception to stderr, for failures of the logging pipeline itself."""
+    print(f'{message}:', file=sys.stderr)
+    traceback.print_exc(file=sys.stderr)
 
 
 # ---- OpenSearch async handler ---------------------------------------------
 
+# Bulk action line; the index goes in the URL (POST /<index>/_bulk)
+BULK_ACTION = b'{"index":{}}\n'
+MIN_BATCH_BYTES = 64 * 1024
+
+
 class OpenSearchHandler(logging.Handler):
     """Non-blocking handler that ships logs to OpenSearch in background.
 
+    Records become dicts once (shared formatter cache) and go to a bounded
+    queue. A collector thread turns the queue into bulk batches sized by bytes
+    and hands them to LOG_BULK_WORKERS sender threads (gzip-compressed
+    requests). Batch size adapts to bulk latency: it grows while requests are
+    under LOG_BULK_TARGET_LATENCY_MS and halves when they are slower or fail.
+
+    A failed batch is retried in place, before that sender takes the next one
+    (order within a batch is kept; with LOG_BULK_WORKERS=1 the global order
+    is kept), and only docs rejected with 429/5xx are retried. After
+    LOG_BULK_MAX_RETRIES, or when the queue is full, docs spill to local
+    segments (SpillStore), which idle sender threads replay one segment at a
+    time, so the collector keeps building live batches. Outcomes are
+    counted in log_shipper_records_total{outcome=queued|shipped|spilled|dropped}.
+
     Env vars:
       - OPENSEARCH_ENABLED (bool)
       - OPENSEARCH_HOST (default: opensearch)
@@ -47,6 +227,15 @@ class OpenSearchHandler(logging.Handler):
       - OPENSEARCH_USER (optional)
       - OPENSEARCH_PASSWORD (optional)
       - OPENSEARCH_INDEX (default: logs-app-v1)
+      - LOG_BULK_WORKERS (default: 2)
+      - LOG_BULK_MAX_BYTES (default: 5 MiB per bulk request, before gzip)
+      - LOG_BULK_TARGET_LATENCY_MS (default: 500)
+      - LOG_BULK_LINGER_MS (default: 200; max wait to fill a batch)
+      - LOG_BULK_MAX_RETRIES (default: 5)
+      - LOG_BULK_GZIP (default: true)
+      - LOG_SPILL_DIR (default: <tmp>/items-api-log-spill; empty = no spill, drop)
+      - LOG_SPILL_SEGMENT_BYTES (default: 4 MiB)
+      - LOG_SPILL_MAX_BYTES (default: 256 MiB on disk, then drop)
     """
 
     def __init__(self, level: int = logging.INFO) -> None:
@@ -58,12 +247,24 @@ class OpenSearchHandler(logging.Handler):
         self.username = os.getenv('OPENSEARCH_USER') or None
         self.password = os.getenv('OPENSEARCH_PASSWORD') or None
         self.index = os.getenv('OPENSEARCH_INDEX', 'logs-app-v1')
+        self.workers = max(int(os.getenv('LOG_BULK_WORKERS', '2')), 1)
+        self.max_batch_bytes = max(int(os.getenv('LOG_BULK_MAX_BYTES', str(5 * 1024 * 1024))), MIN_BATCH_BYTES)
+        self.target_latency = float(os.getenv('LOG_BULK_TARGET_LATENCY_MS', '500')) / 1000
+        self.linger = float(os.getenv('LOG_BULK_LINGER_MS', '200')) / 1000
+        self.max_retries = int(os.getenv('LOG_BULK_MAX_RETRIES', '5'))
+        self.gzip = os.getenv('LOG_BULK_GZIP', 'true').lower() == 'true'
 
         self._q: 'queue.Queue[Dict[str, Any]]' = queue.Queue(maxsize=10000)
+        # Few batches in flight: when senders fall behind the doc queue fills and spills
+        self._batches: 'queue.Queue[List[bytes] | None]' = queue.Queue(maxsize=self.workers * 2)
+        self._batch_bytes = min(512 * 1024, self.max_batch_bytes)
+        self._batch_lock = threading.Lock()
         self._stop = threading.Event()
-        self._thread: threading.Thread | None = None
+        self._threads: List[threading.Thread] = []
         self._client = None
-        if self.enabled and OpenSearch is not None:
+        self._spill: SpillStore | None = None
+        OpenSearch = _import_opensearch() if self.enabled else None
+        if OpenSearch is not None:
             auth = None
             if self.username and self.password:
                 auth = (self.username, self.password)
@@ -71,68 +272,273 @@ class OpenSearchHandler(logging.Handler):
             self._client = OpenSearch(
                 hosts=[url],
                 http_auth=auth,
+                http_compress=self.gzip,
                 timeout=5,
-                max_retries=2,
-                retry_on_timeout=True,
+                # Retries happen per batch in _send (in place, with backoff)
+                max_retries=0,
             )
-            self._thread = threading.Thread(target=self._worker, name='os-logger', daemon=True)
-            self._thread.start()
+            spill_dir = os.getenv('LOG_SPILL_DIR', os.path.join(tempfile.gettempdir(), 'items-api-log-spill'))
+            if spill_dir:
+                self._spill = SpillStore(
+                    spill_dir,
+                    segment_bytes=int(os.getenv('LOG_SPILL_SEGMENT_BYTES', str(4 * 1024 * 1024))),
+                    max_bytes=int(os.getenv('LOG_SPILL_MAX_BYTES', str(256 * 1024 * 1024))),
+                )
+            log_shipper_batch_target_bytes.set(self._batch_bytes)
+            set_gauge_function(log_shipper_queue_depth, self._q.qsize)
+            self._threads.append(threading.Thread(target=self._collector, name='os-logger', daemon=True))
+            for i in range(self.workers):
+                self._threads.append(threading.Thread(target=self._sender, name=f'os-logger-send-{i}', daemon=True))
+            for thread in self._threads:
+                thread.start()
 
     def emit(self, record: logging.LogRecord) -> None:  # noqa: D401
         try:
             if not self.enabled or self._client is None:
                 # Fallback: just print to stdout via base handler-less behavior
                 return
-            # Expect record.msg to be JSON already via formatter; but we push dict
-            msg = self.format(record)
-            obj = json.loads(msg)
-            self._q.put_nowait(obj)
+            formatter = self.formatter
+            doc = formatter.to_dict(record) if isinstance(formatter, UtcIsoTimeFormatter) else json.loads(self.format(record))
+            try:
+                self._q.put_nowait(doc)
+                log_shipper_records_total.labels(outcome='queued').inc()
+            except queue.Full:
+                self._overflow([encode_doc(doc)])
         except Exception:
             # Fallback: swallow errors to not break app
             pass
 
-    def _worker(self) -> None:
-        assert helpers is not None
-        backoff = 0.5
+    def _overflow(self, lines: List[bytes]) -> None:
+        for line in lines:
+            if self._spill is not None and self._spill.append(line):
+                log_shipper_records_total.labels(outcome='spilled').inc()
+            else:
+                log_shipper_records_total.labels(outcome='dropped').inc()
+
+    # Batching
+
+    def _next_batch(self) -> List[bytes]:
+        """Docs until the adaptive byte target or LOG_BULK_LINGER_MS after the first one."""
+        batch: List[bytes] = []
+        size = 0
+        deadline = None
+        while size < self._batch_bytes:
+            timeout = 0.2 if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                doc = self._q.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is None:
+                    break  # idle
+                continue
+            line = encode_doc(doc)
+            batch.append(line)
+            size += len(line)
+            if deadline is None:
+                deadline = time.monotonic() + self.linger
+        return batch
+
+    def _adapt(self, size: int, elapsed: float, ok: bool) -> None:
+        with self._batch_lock:
+            if not ok or elapsed > self.target_latency:
+                self._batch_bytes = max(self._batch_bytes // 2, MIN_BATCH_BYTES)
+            elif size >= self._batch_bytes * 0.9:
+                # Batch filled up and was fast: bigger requests amortize per-request cost
+                self._batch_bytes = min(int(self._batch_bytes * 1.25), self.max_batch_bytes)
+            log_shipper_batch_target_bytes.set(self._batch_bytes)
+
+    # Threads
+
+    def _collector(self) -> None:
         while not self._stop.is_set():
-            batch: List[Dict[str, Any]] = []
             try:
-                # Drain quickly, up to 500 docs or 1s
-                start = time.time()
-                while len(batch) < 500 and (time.time() - start) < 1.0:
+                batch = self._next_batch()
+                while batch:
                     try:
-                        item = self._q.get(timeout=0.2)
-                        batch.append(item)
-                    except queue.Empty:
+                        self._batches.put(batch, timeout=0.5)
                         break
-                if not batch:
-                    continue
-                actions = (
-                    {"_index": self.index, "_source": doc} for doc in batch
-                )
-                helpers.bulk(self._client, actions, refresh=False, raise_on_error=False)
-                backoff = 0.5
-            except Exception:
-                # Light backoff and requeue
-                for doc in batch:
-                    try:
-                        self._q.put_nowait(doc)
                     except queue.Full:
-                        break
-                time.sleep(backoff)
+                        if self._stop.is_set():
+                            # Senders backed up at shutdown: the batch goes to disk
+                            self._overflow(batch)
+                            break
+            except Exception:
+                time.sleep(0.5)
+
+    def _sender(self) -> None:
+        while True:
+            try:
+                batch = self._batches.get(timeout=1.0)
+            except queue.Empty:
+                # Idle: catch up on what spilled while OpenSearch was slow/down
+                if not self._stop.is_set():
+                    self._replay()
+                continue
+            if batch is None:
+                return
+            unsent = self._send(batch)
+            if unsent:
+                self._overflow(unsent)
+
+    def _send(self, batch: List[bytes]) -> List[bytes]:
+        """Bulk with in-place retries; returns the docs that could not be shipped."""
+        assert self._client is not None
+        backoff = 0.5
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                if self._stop.wait(backoff):
+                    break
                 backoff = min(backoff * 2, 10.0)
+            size = sum(len(line) for line in batch)
+            start = time.perf_counter()
+            try:
+                response = self._client.bulk(body=b''.join(BULK_ACTION + line for line in batch), index=self.index)
+            except Exception:
+                self._adapt(size, time.perf_counter() - start, ok=False)
+                continue
+            elapsed = time.perf_counter() - start
+            log_shipper_bulk_duration_seconds.observe(elapsed)
+            self._adapt(size, elapsed, ok=True)
+            retry: List[bytes] = []
+            rejected = 0
+            if response.get('errors'):
+                for line, item in zip(batch, response.get('items', [])):
+                    status = next(iter(item.values())).get('status', 500)
+                    if status == 429 or status >= 500:
+                        retry.append(line)
+                    elif status >= 300:
+                        rejected += 1
+            log_shipper_records_total.labels(outcome='shipped').inc(len(batch) - len(retry) - rejected)
+            # Rejected by OpenSearch (e.g. mapping errors): retrying would not help
+            log_shipper_records_total.labels(outcome='dropped').inc(rejected)
+            batch = retry
+            if not batch:
+                return []
+        return batch
+
+    def _replay(self) -> bool:
+        """Ship one spilled segment; True when there was something to replay."""
+        if self._spill is None:
+            return False
+        segment = self._spill.claim()
+        if segment is None:
+            return False
+        batch: List[bytes] = []
+        size = 0
+        for line in self._spill.read(segment):
+            if self._stop.is_set():
+                # Shutting down: the segment stays on disk for the next process
+                self._spill.release(segment)
+                return True
+            batch.append(line)
+            size += len(line)
+            if size >= self._batch_bytes:
+                if self._send(batch):
+                    # At-least-once: the whole segment goes back and is replayed again later
+                    self._spill.release(segment)
+                    return True
+                batch, size = [], 0
+        if batch and self._send(batch):
+            self._spill.release(segment)
+            return True
+        self._spill.done(segment)
+        return True
+
+    def _spill_pending_batches(self) -> None:
+        while True:
+            try:
+                batch = self._batches.get_nowait()
+            except queue.Empty:
+                return
+            if batch:
+                self._overflow(batch)
 
     def close(self) -> None:  # noqa: D401
+        self._stop.set()
+        if self._threads:
+            self._threads[0].join(timeout=1.0)
+            # Batches no sender took yet go to disk first, making room for the stop signals
+            self._spill_pending_batches()
+            for _ in self._threads[1:]:
+                try:
+                    self._batches.put(None, timeout=1.0)
+                except queue.Full:
+                    break  # senders stuck in a bulk; _send stops retrying and spills what it holds
+            for thread in self._threads[1:]:
+                thread.join(timeout=1.0)
+        # Whatever is still queued survives the restart on disk (counted as dropped without spill)
         try:
-            self._stop.set()
-            if self._thread and self._thread.is_alive():
-                self._thread.join(timeout=1.0)
+            while True:
+                try:
+                    doc = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                self._overflow([encode_doc(doc)])
+            self._spill_pending_batches()
+            if self._spill is not None:
+                self._spill.close()
         except Exception:
-            pass
+            # The logging pipeline is what is shutting down: report straight to stderr
+            _report_error('OpenSearchHandler.close: queued logs may not have been spilled')
         finally:
             super().close()
 
 
+# ---- Queue (formatting and I/O off the request path) -----------------------
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks nor formats on the caller's thread.
+
+    The record is only frozen (message interpolated) before enqueueing; JSON
+    formatting, exception text and I/O happen on the QueueListener thread.
+    When the queue is full the record is dropped and counted.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc()
+
+
+# ---- Access log sampling ----------------------------------------------------
+
+class AccessLogSampler(logging.Filter):
+    """Filter for the access logger: errors always, slow always, the rest sampled.
+
+    Env vars:
+      - ACCESS_LOG_SAMPLE_RATE (0..1, default 1.0): fraction of < 400 responses logged
+      - ACCESS_LOG_SLOW_MS (default 0 = off): requests at/above this are always logged;
+        with ACCESS_LOG_SAMPLE_RATE=0 only errors and slow requests are logged
+
+    Records without status_code (uvicorn's own access line, when it was not
+    disabled with --no-access-log) are dropped: ObservabilityMiddleware is the
+    single access logger, and letting them through would defeat the sampling.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, slow_ms: int = 0) -> None:
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    def filter(self, record: logging.LogRecord) -> bool:  # noqa: D401
+        status_code = getattr(record, 'status_code', None)
+        if status_code is None:
+            return False
+        if status_code >= 400:
+            return True
+        if self.slow_ms and getattr(record, 'duration_ms', 0) >= self.slow_ms:
+            return True
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+
 # ---- Setup logging ---------------------------------------------------------
 
 STANDARD_FIELDS = [
@@ -141,9 +547,34 @@ STANDARD_FIELDS = [
     'duration_ms', 'client_ip', 'user_agent'
 ]
 
+_listener: QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    """Flush the queue into the handlers, then close them (OpenSearch spills what is left)."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        try:
+            handler.close()
+        except Exception:
+            # One failing handler must not keep the others from flushing/spilling
+            _report_error(f'Failed to close log handler {handler!r}')
+    _listener = None
+
+
+atexit.register(_stop_listener)
+
 
 def setup_logging(level: int = logging.INFO) -> None:
-    """Configure root and relevant loggers with JSON format + OpenSearch handler."""
+    """Configure root and relevant loggers with JSON format + OpenSearch handler.
+
+    Loggers only enqueue records (LOG_QUEUE_SIZE, default 10000); a QueueListener
+    thread formats them and feeds stdout and OpenSearch.
+    """
+    global _listener
     fmt = UtcIsoTimeFormatter()
 
     stream_handler = logging.StreamHandler()
@@ -153,15 +584,31 @@ def setup_logging(level: int = logging.INFO) -> None:
     os_handler = OpenSearchHandler(level=level)
     os_handler.setFormatter(fmt)
 
-    # Root logger
-    logging.basicConfig(level=level, handlers=[stream_handler, os_handler])
+    # Re-configuring (e.g. tests, reload) replaces the previous listener
+    _stop_listener()
+    log_queue: 'queue.Queue[logging.LogRecord]' = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000')))
+    set_gauge_function(log_queue_depth, log_queue.qsize)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, stream_handler, os_handler, respect_handler_level=True)
+    _listener.start()
+
+    # Root logger (force: a second call must not keep the previous queue handler)
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
 
     # Align key loggers to same level and handlers
     for name in ['uvicorn', 'uvicorn.error', 'uvicorn.access', 'fastapi', 'sqlalchemy.engine']:
         logger = logging.getLogger(name)
-        logger.handlers = [stream_handler, os_handler]
+        logger.handlers = [queue_handler]
         logger.setLevel(level)
         logger.propagate = False
 
+    # Sampling runs before enqueueing, so discarded access lines cost no formatting/I/O
+    logging.getLogger('uvicorn.access').filters = [AccessLogSampler(
+        sample_rate=float(os.getenv('ACCESS_LOG_SAMPLE_RATE', '1.0')),
+        slow_ms=int(os.getenv('ACCESS_LOG_SLOW_MS', '0')),
+    )]
+
     # Reduce noisy libraries
     logging.getLogger('urllib3').setLevel(logging.WARNING)
+    # opensearch-py logs every _bulk at INFO: shipping those would feed back into the pipeline
+    logging.getLogger('opensearch').setLevel(logging.WARNING)
@@ -1,81 +1,327 @@
 from __future__ import annotations
 
 import uuid
-from typing import List
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Literal
 
-from fastapi import FastAPI, Depends, HTTPException, Query, status
+from fastapi import APIRouter, FastAPI, Depends, Header, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from .config import get_settings
-from .db import get_db, engine
+from .db import get_db, get_engine, ensure_columns, ensure_indexes, schema_setup_lock
 from .models import Base
-from .schemas import ItemCreate, ItemOut, ItemUpdate
-from .repository import list_items, get_item, create_item, update_item, delete_item
+from .counters import check_status_counters, ensure_status_counters
+from .changes import change_hub, changes_available, check_change_seq
+from .schemas import (
+    BatchItemResult, BatchResult, ItemBatchCreate, ItemBatchDelete, ItemBatchUpdate,
+    ItemCreate, ItemOut, ItemStats, ItemUpdate,
+)
+from .repository import (
+    create_item, update_item, delete_item, item_exists, parse_fields,
+    create_items, update_items, delete_items, search_item_rows, get_status_counts, estimate_total,
+)
+from .etags import etag_matches, if_match_versions, item_etag, not_modified
+from .cache import item_cache
+from .responses import FastJSONResponse, ListPage, list_page
+from .singleflight import list_flight
+from .export import iter_export
 from .enums import Status
 from .metrics import setup_metrics
 from .logging_conf import setup_logging
-from .middleware import correlation_middleware
+from .middleware import ObservabilityMiddleware
+from .compression import CompressionMiddleware
+from .admission import AdaptiveLimit, AdmissionControlMiddleware
+from .routes_async import router as async_items_router
 
 settings = get_settings()
 
 # Configure logging as early as possible
 setup_logging()
 
-app = FastAPI(title="Items API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if settings.DB_CREATE_SCHEMA:
+        # Criação automática apenas para fins didáticos (ver README)
+        engine = get_engine()
+        # Um processo por vez (workers do Gunicorn e réplicas sobem juntos); quem
+        # esperou o lock encontra o schema pronto e pula
+        with schema_setup_lock(engine) as run_setup:
+            if run_setup:
+                Base.metadata.create_all(bind=engine)
+                # Tabelas pré-existentes não ganham colunas nem índices novos via create_all
+                ensure_columns(engine, Base.metadata, add_generated=settings.DB_ADD_GENERATED_COLUMNS)
+                ensure_indexes(engine, Base.metadata)
+                ensure_status_counters(engine)
+    # Vale também para DB_CREATE_SCHEMA=false (schema de migração): sem triggers, COUNT(*)
+    check_status_counters(get_engine())
+    if changes_available(settings.DATABASE_URL) and check_change_seq(get_engine()):
+        # Uma conexão LISTEN por processo, fora do pool (ver backend/changes.py)
+        change_hub.start(settings.DATABASE_URL)
+    yield
+    await change_hub.close()
+
+app = FastAPI(title="Items API", version="0.1.0", lifespan=lifespan)
 setup_metrics(app)
 
+# Load shedding por orçamento (leitura/escrita); dentro do CORS, então o 503 sai
+# com os headers de CORS e é contado/logado pelo ObservabilityMiddleware
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        read=AdaptiveLimit(
+            "read", settings.ADMISSION_READ_LIMIT, settings.ADMISSION_MIN_LIMIT, settings.ADMISSION_MAX_LIMIT,
+            tolerance=settings.ADMISSION_LATENCY_TOLERANCE,
+        ),
+        write=AdaptiveLimit(
+            "write", settings.ADMISSION_WRITE_LIMIT, settings.ADMISSION_MIN_LIMIT, settings.ADMISSION_MAX_LIMIT,
+            tolerance=settings.ADMISSION_LATENCY_TOLERANCE,
+        ),
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        exempt_paths=settings.ADMISSION_EXEMPT_PATHS,
+    )
+
 # CORS: permitir frontend Streamlit padrão
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:8501"],
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"]
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Total-Count", "Retry-After"],
 )
 
-# Correlation/access logging middleware
-app.middleware("http")(correlation_middleware)
+# gzip/br negociado pelo Accept-Encoding; respostas menores que o limiar vão sem compressão
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_BYTES,
+        compresslevel=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Correlation id + access log + métricas HTTP numa única passada ASGI (mais externo)
+app.add_middleware(
+    ObservabilityMiddleware,
+    routes=app.router.routes,
+    metrics=settings.METRICS_ENABLED,
+    access_log=settings.ACCESS_LOG_ENABLED,
+    request_id_header=settings.REQUEST_ID_HEADER,
+)
+
+# Export completo em streaming (NDJSON ou CSV) com cursor no servidor
+@app.get("/items/export")
+def api_export_items(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    status: Status | None = Query(None),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        iter_export(format, status),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
+    )
+
+# Busca textual ranqueada (tsvector + GIN no Postgres; LIKE em outros bancos).
+# Paginação por offset: a ordem é por relevância, sem chave de cursor estável.
+@app.get("/items/search", response_model=List[ItemOut])
+def api_search_items(
+    q: str = Query(..., max_length=200, description="Termos; aceita \"frase\", OR e -exclusão"),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    status: Status | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    # Só espaços viraria LIKE '% %' (casa quase tudo) ou tsquery vazia
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Informe ao menos um termo em q")
+    rows = search_item_rows(db, q, limit=limit, offset=offset, status=status)
+    if settings.FAST_JSON:
+        return FastJSONResponse(rows)
+    return rows
+
+# Contagens por status sem COUNT(*) na tabela (contadores mantidos por trigger)
+@app.get("/items/stats", response_model=ItemStats)
+def api_item_stats(
+    estimated: bool = Query(False, description="total pelas estatísticas do planner (aproximado)"),
+    db: Session = Depends(get_db),
+):
+    counts = get_status_counts(db)
+    total = estimate_total(db) if estimated else None
+    if total is None:
+        return ItemStats(total=sum(counts.values()), by_status=counts)
+    return ItemStats(total=total, by_status=counts, estimated=True)
+
+# Feed de mudanças em SSE (LISTEN/NOTIFY). Retoma pelo cursor (?cursor= ou o
+# Last-Event-ID que o EventSource reenvia ao reconectar) enquanto o evento
+# ainda estiver no buffer do processo; senão o stream começa com `reset`.
+@app.get("/items/changes")
+async def api_item_changes(
+    cursor: int | None = Query(None, description="Último id de evento recebido"),
+    last_event_id: str | None = Header(None),
+):
+    if not changes_available(settings.DATABASE_URL):
+        raise HTTPException(status_code=503, detail="Feed de mudanças requer Postgres e CHANGE_EVENTS_ENABLED=true")
+    if cursor is None and last_event_id:
+        try:
+            cursor = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID inválido")
+    return StreamingResponse(
+        change_hub.stream(cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@app.on_event("startup")
-def startup_event() -> None:
-    # Criação automática apenas para fins didáticos (ver README)
-    Base.metadata.create_all(bind=engine)
+# Lote: uma transação por requisição, independente de DB_ASYNC.
+# Declarados antes de /items/{item_id} (ordem de registro decide o match).
 
-@app.get("/items", response_model=List[ItemOut])
+def _check_batch_size(n: int) -> None:
+    if n > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {settings.BATCH_MAX_ITEMS} operações por lote")
+
+@app.post("/items:batch", response_model=BatchResult)
+def api_create_items(payload: ItemBatchCreate, db: Session = Depends(get_db)):
+    _check_batch_size(len(payload.items))
+    rows = create_items(db, payload.items)
+    item_cache.invalidate()
+    return BatchResult(results=[
+        BatchItemResult(index=i, id=row.id, result='created', item=ItemOut.model_validate(row))
+        for i, row in enumerate(rows)
+    ])
+
+@app.patch("/items:batch", response_model=BatchResult)
+def api_update_items(payload: ItemBatchUpdate, db: Session = Depends(get_db)):
+    _check_batch_size(len(payload.items))
+    ops = [(op.id, ItemUpdate(**op.model_dump(exclude={'id'}))) for op in payload.items]
+    updated = update_items(db, ops)
+    item_cache.invalidate()
+    return BatchResult(results=[
+        BatchItemResult(index=i, id=op.id, result='updated', item=ItemOut.model_validate(updated[op.id]))
+        if op.id in updated else BatchItemResult(index=i, id=op.id, result='not_found')
+        for i, op in enumerate(payload.items)
+    ])
+
+@app.delete("/items:batch", response_model=BatchResult)
+def api_delete_items(payload: ItemBatchDelete, db: Session = Depends(get_db)):
+    _check_batch_size(len(payload.ids))
+    deleted = delete_items(db, payload.ids)
+    item_cache.invalidate()
+    return BatchResult(results=[
+        BatchItemResult(index=i, id=id, result='deleted' if id in deleted else 'not_found')
+        for i, id in enumerate(payload.ids)
+    ])
+
+# Handlers CRUD síncronos (threadpool); com DB_ASYNC=true usa-se routes_async
+items_router = APIRouter()
+
+@items_router.get("/items", response_model=List[ItemOut])
 def api_list_items(
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     status: Status | None = Query(None),
+    cursor: str | None = Query(None, description="Cursor opaco retornado em X-Next-Cursor"),
+    fields: str | None = Query(None, description="Projeção: colunas separadas por vírgula (ex.: id,title,status)"),
+    include_total: bool = Query(False, description="Devolve X-Total-Count (total do filtro de status)"),
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db)
 ):
-    return list_items(db, limit=limit, offset=offset, status=status)
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use cursor ou offset, não ambos")
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {}
+    if settings.LIST_ETAG:
+        # Versão lida antes da página: numa escrita concorrente o ETag fica
+        # mais velho que o corpo (força novo GET), nunca mais novo
+        etag = item_cache.list_etag(db, status)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        headers["ETag"] = etag
+
+    def load() -> ListPage:
+        items = item_cache.list_items(db, limit=limit, offset=offset, status=status, cursor=cursor, fields=projection)
+        return list_page(items, limit, projection, settings.FAST_JSON)
 
-@app.get("/items/{item_id}", response_model=ItemOut)
-def api_get_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
-    obj = get_item(db, item_id)
+    try:
+        # Requisições idênticas simultâneas esperam a mesma consulta + serialização;
+        # o ETag entra na chave para o corpo nunca ser mais velho que ele
+        page = list_flight.do((limit, offset, status, cursor, projection, headers.get("ETag")), load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if include_total:
+        counts = get_status_counts(db)
+        headers["X-Total-Count"] = str(counts[status] if status else sum(counts.values()))
+    if page.body is not None:
+        return Response(page.body, media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return page.items
+
+@items_router.get("/items/{item_id}", response_model=ItemOut)
+def api_get_item(
+    item_id: uuid.UUID,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    obj = item_cache.get_item(db, item_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Item não encontrado")
+    etag = item_etag(obj)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if settings.FAST_JSON:
+        return FastJSONResponse(obj, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return obj
 
-@app.post("/items", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
-def api_create_item(payload: ItemCreate, db: Session = Depends(get_db)):
+@items_router.post("/items", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
+def api_create_item(payload: ItemCreate, response: Response, db: Session = Depends(get_db)):
     try:
         obj = create_item(db, payload)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    item_cache.invalidate()
+    response.headers["ETag"] = item_etag(obj)
     return obj
 
-@app.put("/items/{item_id}", response_model=ItemOut)
-def api_update_item(item_id: uuid.UUID, payload: ItemUpdate, db: Session = Depends(get_db)):
-    obj = update_item(db, item_id, payload)
+# If-Match vai para o WHERE do UPDATE/DELETE; só quando nada é afetado há uma
+# segunda consulta, para responder 404 (não existe) ou 412 (versão mudou)
+
+@items_router.put("/items/{item_id}", response_model=ItemOut)
+def api_update_item(
+    item_id: uuid.UUID,
+    payload: ItemUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    versions = if_match_versions(if_match)
+    obj = update_item(db, item_id, payload, if_match=versions)
     if not obj:
+        if versions is not None and item_exists(db, item_id):
+            raise HTTPException(status_code=412, detail="Item modificado por outra requisição (ETag não confere)")
         raise HTTPException(status_code=404, detail="Item não encontrado")
+    item_cache.invalidate()
+    response.headers["ETag"] = item_etag(obj)
     return obj
 
-@app.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def api_delete_item(item_id: uuid.UUID, db: Session = Depends(get_db)):
-    ok = delete_item(db, item_id)
+@items_router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+def api_delete_item(item_id: uuid.UUID, if_match: str | None = Header(None), db: Session = Depends(get_db)):
+    versions = if_match_versions(if_match)
+    ok = delete_item(db, item_id, if_match=versions)
     if not ok:
+        if versions is not None and item_exists(db, item_id):
+            raise HTTPException(status_code=412, detail="Item modificado por outra requisição (ETag não confere)")
         raise HTTPException(status_code=404, detail="Item não encontrado")
+    item_cache.invalidate()
     return None
+
+app.include_router(async_items_router if settings.DB_ASYNC else items_router)
@@ -1,13 +1,36 @@
+import asyncio
+import gzip
+import os
+import re
+import threading
 import time
-from typing import Callable
+from typing import Callable, List, Tuple
 
-from fastapi import FastAPI, Request
-from prometheus_client import Counter, Histogram, Gauge, make_asgi_app
+from fastapi import FastAPI
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, Gauge, generate_latest, multiprocess,
+)
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.routing import BaseRoute, Match
+from starlette.types import Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# O label "path" é o template da rota (ex.: /items/{item_id}), nunca o path bruto: IDs
+# dinâmicos criariam uma série nova por item (cardinalidade sem limite). Paths que não
+# casam com nenhuma rota vão todos para UNMATCHED_PATH e métodos fora de KNOWN_METHODS
+# para "OTHER", então o número de séries é limitado pelas rotas da aplicação.
+UNMATCHED_PATH = "<unmatched>"
+KNOWN_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
 
-# Observação: usar o caminho bruto (request.url.path) como label pode causar alta cardinalidade
-# quando há IDs dinâmicos (ex.: /items/123). Para fins didáticos, usaremos o path literal.
-# Em produção, normalize para padrões de rota (ex.: /items/{id}) ou use middlewares que exponham
-# nomes de rotas para reduzir cardinalidade.
+# Multiprocess (Gunicorn com PROMETHEUS_MULTIPROC_DIR): cada worker grava seus valores
+# em arquivos mmap e o scrape soma todos. Gauges usam "livesum" (soma só dos workers
+# vivos; sem label pid) e o alvo de lote dos logs "livemax". Decidido no import, como
+# o próprio prometheus_client faz.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
 
 # Métricas globais
 http_requests_total = Counter(
@@ -27,7 +50,8 @@ http_request_duration_seconds = Histogram(
 http_requests_in_progress = Gauge(
     "http_requests_in_progress",
     "Requisições HTTP em andamento",
-    labelnames=["method", "path"],
+    labelnames=["method"],
+    multiprocess_mode="livesum",
 )
 
 http_exceptions_total = Counter(
@@ -36,44 +60,336 @@ http_exceptions_total = Counter(
     labelnames=["method", "path", "exception_type"],
 )
 
+# Pool de conexões do SQLAlchemy (label pool = sync|async)
+db_pool_size = Gauge(
+    "db_pool_size",
+    "Tamanho configurado do pool (conexões persistentes)",
+    labelnames=["pool"],
+    multiprocess_mode="livesum",
+)
 
-def setup_metrics(app: FastAPI) -> None:
-    """Configura middleware de métricas e expõe /metrics.
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "Conexões do pool em uso (checked out)",
+    labelnames=["pool"],
+    multiprocess_mode="livesum",
+)
+
+db_pool_overflow = Gauge(
+    "db_pool_overflow",
+    "Conexões de overflow abertas além de pool_size",
+    labelnames=["pool"],
+    multiprocess_mode="livesum",
+)
+
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tempo para obter uma conexão do pool (fila + eventual connect)",
+    labelnames=["pool"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+)
+
+db_pool_checkout_timeouts_total = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts que estouraram pool_timeout (pool esgotado)",
+    labelnames=["pool"],
+)
+
+db_pool_invalidations_total = Counter(
+    "db_pool_invalidations_total",
+    "Conexões invalidadas (hard = descartada, soft = descartada no próximo checkin)",
+    labelnames=["pool", "kind"],
+)
+
+# Cache read-through (backend = memory|redis, kind = item|list|version)
+cache_hits_total = Counter(
+    "cache_hits_total",
+    "Leituras atendidas pelo cache",
+    labelnames=["backend", "kind"],
+)
+
+cache_misses_total = Counter(
+    "cache_misses_total",
+    "Leituras que foram ao banco (cache vazio, expirado ou invalidado)",
+    labelnames=["backend", "kind"],
+)
+
+cache_errors_total = Counter(
+    "cache_errors_total",
+    "Falhas do backend de cache (op = get|set|incr|generation); a requisição segue sem cache",
+    labelnames=["backend", "op"],
+)
+
+cache_evictions_total = Counter(
+    "cache_evictions_total",
+    "Entradas removidas do cache em processo (reason = ttl|lru)",
+    labelnames=["backend", "reason"],
+)
+
+# Pipeline de logs (backend/logging_conf.py)
+log_queue_depth = Gauge(
+    "log_queue_depth",
+    "Registros de log aguardando o QueueListener",
+    multiprocess_mode="livesum",
+)
+
+log_records_dropped_total = Counter(
+    "log_records_dropped_total",
+    "Registros de log descartados com a fila do QueueListener cheia",
+)
+
+log_shipper_records_total = Counter(
+    "log_shipper_records_total",
+    "Registros do envio ao OpenSearch por destino (queued|shipped|spilled|dropped)",
+    labelnames=["outcome"],
+)
+
+log_shipper_queue_depth = Gauge(
+    "log_shipper_queue_depth",
+    "Docs aguardando envio ao OpenSearch (fila em memória)",
+    multiprocess_mode="livesum",
+)
+
+log_shipper_bulk_duration_seconds = Histogram(
+    "log_shipper_bulk_duration_seconds",
+    "Duração das requisições _bulk ao OpenSearch",
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+)
+
+log_shipper_batch_target_bytes = Gauge(
+    "log_shipper_batch_target_bytes",
+    "Tamanho alvo (bytes) dos lotes _bulk, ajustado pela latência",
+    multiprocess_mode="livemax",
+)
+
+
+# Admission control (backend/admission.py); budget = read|write
+admission_limit = Gauge(
+    "admission_limit",
+    "Limite de concorrência adaptativo atual (soma dos workers)",
+    labelnames=["budget"],
+    multiprocess_mode="livesum",
+)
+
+admission_in_flight = Gauge(
+    "admission_in_flight",
+    "Requisições admitidas em andamento",
+    labelnames=["budget"],
+    multiprocess_mode="livesum",
+)
+
+admission_rejected_total = Counter(
+    "admission_rejected_total",
+    "Requisições recusadas com 503 por exceder o limite de concorrência",
+    labelnames=["budget"],
+)
+
+# Coalescência de leituras idênticas (backend/singleflight.py)
+singleflight_requests_total = Counter(
+    "singleflight_requests_total",
+    "Leituras por papel: leader executa a consulta, follower reaproveita a de um leader em andamento",
+    labelnames=["name", "role"],
+)
+
+# Feed de mudanças (backend/changes.py)
+changes_subscribers = Gauge(
+    "changes_subscribers",
+    "Conexões SSE abertas em GET /items/changes",
+    multiprocess_mode="livesum",
+)
+
+changes_events_total = Counter(
+    "changes_events_total",
+    "Eventos recebidos via LISTEN e repassados aos assinantes do processo",
+)
 
-    - Contabiliza requests por método, path e status_code.
-    - Mede duração em histogram por método e path.
-    - Gauge de requisições em progresso.
-    - Contador de exceções por tipo.
-    - Monta endpoint /metrics via make_asgi_app (content-type do Prometheus).
+changes_dropped_subscribers_total = Counter(
+    "changes_dropped_subscribers_total",
+    "Assinantes desconectados por ficarem para trás (fila cheia) ou por reconexão do LISTEN",
+    labelnames=["reason"],
+)
+
+
+# ---- Gauges lidos de funções --------------------------------------------------
+
+GAUGE_REFRESH_SECONDS = 1.0
+_function_gauges: List[Tuple[Gauge, Callable[[], float]]] = []
+_refresher: threading.Thread | None = None
+_refresher_lock = threading.Lock()
+
+
+def set_gauge_function(gauge: Gauge, fn: Callable[[], float]) -> None:
+    """`gauge.set_function(fn)` que também funciona em multiprocess.
+
+    `set_function` só é lido no registry do próprio processo; em multiprocess o
+    scrape lê arquivos, então uma thread do worker grava `fn()` a cada
+    GAUGE_REFRESH_SECONDS.
     """
+    global _refresher
+    if not MULTIPROCESS:
+        gauge.set_function(fn)
+        return
+    with _refresher_lock:
+        _function_gauges.append((gauge, fn))
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_gauges, name="metrics-gauges", daemon=True)
+            _refresher.start()
 
-    @app.middleware("http")
-    async def metrics_middleware(request: Request, call_next: Callable):  # type: ignore[override]
-        method = request.method
-        path = request.url.path
-        start = time.perf_counter()
 
-        # In-progress + duração
-        http_requests_in_progress.labels(method=method, path=path).inc()
-        status_code = 500
+def _refresh_gauges() -> None:
+    while True:
+        for gauge, fn in list(_function_gauges):
+            try:
+                gauge.set(fn())
+            except Exception:  # noqa: BLE001 - uma função com erro não derruba as outras
+                pass
+        time.sleep(GAUGE_REFRESH_SECONDS)
+
+
+class _TimedCheckoutMixin:
+    """Mede a espera de checkout; o SQLAlchemy não tem evento antes do checkout."""
+
+    metrics_label = "sync"
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        start = time.perf_counter()
         try:
-            response = await call_next(request)
-            status_code = int(getattr(response, "status_code", 500))
-            return response
-        except Exception as exc:  # noqa: BLE001 - contamos exceções genéricas para métricas
-            # Conta exceções por tipo
-            http_exceptions_total.labels(
-                method=method, path=path, exception_type=exc.__class__.__name__
-            ).inc()
-            # Repropaga após marcar; FastAPI tratará e retornará 500
+            return super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            db_pool_checkout_timeouts_total.labels(pool=self.metrics_label).inc()
             raise
         finally:
-            duration = time.perf_counter() - start
-            http_request_duration_seconds.labels(method=method, path=path).observe(duration)
-            http_requests_in_progress.labels(method=method, path=path).dec()
-            http_requests_total.labels(
-                method=method, path=path, status_code=str(status_code)
-            ).inc()
+            db_pool_checkout_wait_seconds.labels(pool=self.metrics_label).observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def instrument_pool(pool: Pool, label: str) -> None:
+    """Liga o pool às métricas: gauges lidos no scrape e eventos de invalidação."""
+    if isinstance(pool, QueuePool):
+        # Lidos do próprio pool a cada scrape: sem custo por request e sem valores defasados
+        set_gauge_function(db_pool_size.labels(pool=label), pool.size)
+        set_gauge_function(db_pool_checked_out.labels(pool=label), pool.checkedout)
+        set_gauge_function(db_pool_overflow.labels(pool=label), lambda: max(pool.overflow(), 0))
+
+    event.listen(pool, "invalidate", lambda *_a: db_pool_invalidations_total.labels(pool=label, kind="hard").inc())
+    event.listen(pool, "soft_invalidate", lambda *_a: db_pool_invalidations_total.labels(pool=label, kind="soft").inc())
+
+
+def route_template(routes: List[BaseRoute], scope: Scope) -> str:
+    """Template da rota que atendeu `scope`.
+
+    O FastAPI grava a rota em `scope["route"]` durante o roteamento (inclusive dentro
+    de routers incluídos); para o resto (ex.: Mount do /metrics, 404) refaz o match
+    do Router do Starlette nas rotas de primeiro nível.
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if path is not None:
+        return path
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_PATH)
+        if match == Match.PARTIAL and partial is None:
+            # Ex.: método não permitido (405) numa rota existente
+            partial = getattr(route, "path", UNMATCHED_PATH)
+    return partial or UNMATCHED_PATH
+
+
+def record_request(method: str, path: str, status_code: int, duration: float) -> None:
+    """Registra uma requisição concluída (chamado pelo ObservabilityMiddleware)."""
+    http_request_duration_seconds.labels(method=method, path=path).observe(duration)
+    http_requests_total.labels(method=method, path=path, status_code=str(status_code)).inc()
+
+
+# ---- Exposição -----------------------------------------------------------------
+
+_PID_FILE = re.compile(r"_(\d+)\.db$")
+
+
+def mark_dead_workers(path: str) -> None:
+    """Remove os gauges "live" de workers que não existem mais.
+
+    O `child_exit` do Gunicorn já faz isso; aqui cobre workers mortos sem o hook
+    (SIGKILL/OOM do master, `uvicorn --workers`). Contadores e histograms de
+    workers mortos ficam: apagá-los faria os totais andarem para trás.
+    """
+    pids = {int(m.group(1)) for name in os.listdir(path) if (m := _PID_FILE.search(name))}
+    for pid in pids - {os.getpid()}:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            multiprocess.mark_process_dead(pid, path)
+        except PermissionError:
+            pass
+
 
+class CachedMetricsApp:
+    """/metrics com a exposição em cache por `ttl` segundos (0 = sem cache).
+
+    Em multiprocess cada scrape abre e soma os arquivos de todos os workers; com
+    scrapes frequentes (várias réplicas do Prometheus, dashboards) o mesmo texto
+    é reaproveitado. Renderiza no threadpool e um scrape concorrente espera o que
+    já está em andamento em vez de agregar de novo.
+    """
+
+    def __init__(self, registry: CollectorRegistry, ttl: float, multiproc_dir: str | None = None) -> None:
+        self.registry = registry
+        self.ttl = ttl
+        self.multiproc_dir = multiproc_dir
+        self._lock = asyncio.Lock()
+        self._expires = 0.0
+        self._body = b""
+        self._gzipped: bytes | None = None
+
+    def _render(self) -> bytes:
+        if self.multiproc_dir:
+            mark_dead_workers(self.multiproc_dir)
+        return generate_latest(self.registry)
+
+    async def _current(self) -> None:
+        async with self._lock:
+            if time.monotonic() < self._expires:
+                return
+            self._body = await run_in_threadpool(self._render)
+            self._gzipped = None
+            self._expires = time.monotonic() + self.ttl
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._current()
+        body, headers = self._body, {}
+        if "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            if self._gzipped is None:
+                self._gzipped = gzip.compress(body)
+            body, headers = self._gzipped, {"Content-Encoding": "gzip"}
+        await Response(body, media_type=CONTENT_TYPE_LATEST, headers=headers)(scope, receive, send)
+
+
+def setup_metrics(app: FastAPI) -> None:
+    """Expõe /metrics.
+
+    As métricas HTTP (requests por método, template de rota e status_code, histogram
+    de duração, gauge em progresso por método, exceções por tipo) são registradas pelo
+    `ObservabilityMiddleware` (backend/middleware.py), junto com request id e access log.
+    - Monta endpoint /metrics (CachedMetricsApp, content-type do Prometheus).
+    - Com PROMETHEUS_MULTIPROC_DIR (Gunicorn, vários workers), o scrape agrega os
+      arquivos de todos os workers em vez de mostrar só o worker que atendeu.
+    - METRICS_CACHE_SECONDS (padrão 1 em multiprocess, 0 sem) reaproveita a exposição
+      entre scrapes próximos; workers mortos têm os gauges "live" descartados.
+    """
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+    if multiproc_dir:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, multiproc_dir)
+    else:
+        registry = REGISTRY
+    ttl = float(os.getenv("METRICS_CACHE_SECONDS", "1" if multiproc_dir else "0"))
     # Expor /metrics (Prometheus exposition format - text/plain; version 0.0.4)
-    app.mount("/metrics", make_asgi_app())
+    app.mount("/metrics", CachedMetricsApp(registry, ttl, multiproc_dir))
@@ -3,48 +3,112 @@ from __future__ import annotations
 import logging
 import time
 import uuid
-from typing import Callable
+from typing import List
 
-from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import (
+    KNOWN_METHODS,
+    http_exceptions_total,
+    http_requests_in_progress,
+    record_request,
+    route_template,
+)
 
 logger = logging.getLogger("uvicorn.access")
 
 
-async def correlation_middleware(request: Request, call_next: Callable):  # type: ignore[override]
-    start = time.perf_counter()
+class ObservabilityMiddleware:
+    """Correlation id + access log + Prometheus metrics in one pure ASGI pass.
 
-    # Correlation: request_id from header or generate
-    request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+    One timer and one header scan per request, and no BaseHTTPMiddleware
+    (which adds a task and a memory stream per request and per middleware).
 
-    # Client info
-    client_ip = (request.client.host if request.client else None) or request.headers.get("X-Forwarded-For", "-")
-    user_agent = request.headers.get("User-Agent", "-")
+    Options (see Settings):
+      - metrics: record http_* metrics (label path = route template)
+      - access_log: emit the "HTTP access" line on the uvicorn.access logger
+      - request_id_header: header read from the request (or generated) and
+        echoed on the response
+    """
 
-    try:
-        response = await call_next(request)
-        status_code = int(getattr(response, "status_code", 500))
-        # Propagate header when response exists
-        try:
-            response.headers.setdefault('X-Request-ID', request_id)
-        except Exception:
-            pass
-        return response
-    except Exception:
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: List[BaseRoute],
+        metrics: bool = True,
+        access_log: bool = True,
+        request_id_header: str = "X-Request-ID",
+    ) -> None:
+        self.app = app
+        # Live list: routes registered after the middleware is added are seen too
+        self.routes = routes
+        self.metrics = metrics
+        self.access_log = access_log
+        self.request_id_header = request_id_header
+        self._request_id_key = request_id_header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        # Correlation: request_id from header or generate; client info in the same scan
+        request_id = user_agent = forwarded_for = None
+        for key, value in scope["headers"]:
+            if key == self._request_id_key:
+                request_id = value.decode("latin-1")
+            elif key == b"user-agent":
+                user_agent = value.decode("latin-1")
+            elif key == b"x-forwarded-for":
+                forwarded_for = value.decode("latin-1")
+        request_id = request_id or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        method = scope["method"]
+        metric_method = method if method in KNOWN_METHODS else "OTHER"
         status_code = 500
-        # Log stack with context
-        logging.getLogger("fastapi").exception("Unhandled exception")
-        raise
-    finally:
-        duration_ms = int((time.perf_counter() - start) * 1000)
-        extra = {
-            "request_id": request_id,
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": status_code,
-            "duration_ms": duration_ms,
-            "client_ip": client_ip,
-            "user_agent": user_agent,
-        }
-        # Access log line
-        logger.info("HTTP access", extra=extra)
-    # In exception path, response is generated upstream; header may not be set here
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Propagate header unless the handler already set one
+                MutableHeaders(scope=message).setdefault(self.request_id_header, request_id)
+            await send(message)
+
+        if self.metrics:
+            in_progress = http_requests_in_progress.labels(method=metric_method)
+            in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:  # noqa: BLE001 - counted and logged, then re-raised
+            status_code = 500
+            if self.metrics:
+                http_exceptions_total.labels(
+                    method=metric_method,
+                    path=route_template(self.routes, scope),
+                    exception_type=exc.__class__.__name__,
+                ).inc()
+            # Log stack with context; ServerErrorMiddleware answers the 500
+            logging.getLogger("fastapi").exception("Unhandled exception", extra={"request_id": request_id})
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            if self.metrics:
+                in_progress.dec()
+                record_request(metric_method, route_template(self.routes, scope), status_code, duration)
+            if self.access_log:
+                client = scope.get("client")
+                logger.info("HTTP access", extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": int(duration * 1000),
+                    "client_ip": (client[0] if client else None) or forwarded_for or "-",
+                    "user_agent": user_agent or "-",
+                })
@@ -2,15 +2,71 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import Enum, String, Text, TIMESTAMP, func
+from sqlalchemy import BigInteger, Computed, Enum, Index, Sequence, SmallInteger, String, Text, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql.expression import FunctionElement, literal_column
 
 from .enums import Status
 
 class Base(DeclarativeBase):
     pass
 
+# Dicionário da busca textual: 'simple' não remove stopwords nem faz stemming,
+# então serve a títulos em qualquer idioma. A consulta precisa usar o mesmo.
+SEARCH_CONFIG = 'simple'
+
+@compiles(CreateColumn)
+def _skip_postgresql_only(element, compiler, **kw):  # type: ignore[no-untyped-def]
+    # Colunas com info['postgresql_only'] não existem em outros bancos (ex.: SQLite local)
+    if element.element.info.get('postgresql_only') and compiler.dialect.name != 'postgresql':
+        return None
+    return compiler.visit_create_column(element, **kw)
+
+class bump_timestamp(FunctionElement):
+    """Novo valor de uma coluna de versão (updated_at) numa escrita.
+
+    Postgres: now() (microssegundos). SQLite: CURRENT_TIMESTAMP só tem segundos,
+    então duas escritas no mesmo segundo manteriam o ETag; lá o valor vira
+    'YYYY-MM-DD HH:MM:SS.SSS' e é sempre maior que o atual (mínimo +1 ms).
+    """
+    type = TIMESTAMP(timezone=True)
+    inherit_cache = True
+    name = 'bump_timestamp'
+
+@compiles(bump_timestamp)
+def _bump_timestamp(element, compiler, **kw):  # type: ignore[no-untyped-def]
+    return compiler.process(func.now(), **kw)
+
+@compiles(bump_timestamp, 'sqlite')
+def _bump_timestamp_sqlite(element, compiler, **kw):  # type: ignore[no-untyped-def]
+    current = compiler.process(element.clauses.clauses[0], **kw)
+    # 1,5 ms: depois do arredondamento para ms de %f continua > atual
+    return f"strftime('%Y-%m-%d %H:%M:%f', max(julianday('now'), julianday({current}) + 0.0015 / 86400.0))"
+
+class stored_timestamp(FunctionElement):
+    """Coluna de timestamp num formato comparável ao bind (repository._StoredTimestamp).
+
+    No SQLite as linhas têm 'YYYY-MM-DD HH:MM:SS' (CURRENT_TIMESTAMP) ou
+    '... .SSS' (bump_timestamp); strftime('%f') normaliza os dois. Nos demais
+    bancos é a própria coluna (índices continuam valendo).
+    """
+    type = TIMESTAMP(timezone=True)
+    inherit_cache = True
+    name = 'stored_timestamp'
+
+@compiles(stored_timestamp)
+def _stored_timestamp(element, compiler, **kw):  # type: ignore[no-untyped-def]
+    return compiler.process(element.clauses.clauses[0], **kw)
+
+@compiles(stored_timestamp, 'sqlite')
+def _stored_timestamp_sqlite(element, compiler, **kw):  # type: ignore[no-untyped-def]
+    return f"strftime('%Y-%m-%d %H:%M:%f', {compiler.process(element.clauses.clauses[0], **kw)})"
+
 class ItemORM(Base):
     __tablename__ = 'items'
 
@@ -19,4 +75,45 @@ class ItemORM(Base):
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     status: Mapped[Status] = mapped_column(Enum(Status, create_constraint=True, native_enum=True), default=Status.pending, nullable=False)
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=bump_timestamp(literal_column('updated_at')),
+        nullable=False,
+    )
+    # Gerada pelo Postgres (título peso A, descrição peso B). deferred: fica fora
+    # de select(ItemORM); só os filtros/ranking de busca a referenciam
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+        info={'postgresql_only': True},
+    )
+
+    __table_args__ = (
+        # Suporta ORDER BY created_at DESC, id DESC e a paginação por cursor (keyset)
+        Index('ix_items_created_at_id', created_at.desc(), id.desc()),
+        # Filtro por status + mesma ordenação: evita Seq Scan + Sort em GET /items?status=...
+        Index('ix_items_status_created_at_id', status, created_at.desc(), id.desc()),
+        # GET /items/search: search_vector @@ tsquery sem varrer a tabela
+        Index('ix_items_search_vector', search_vector, postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
+class ItemStatusCountORM(Base):
+    """Contagem de items por status, mantida por triggers (backend/counters.py).
+
+    Cada status tem até COUNTER_SHARDS linhas (shard = pid da conexão % N):
+    escritas concorrentes em conexões diferentes não disputam o lock da mesma
+    linha, e a leitura soma no máximo 3 x N linhas, independente do tamanho de items.
+    """
+    __tablename__ = 'item_status_counts'
+
+    status: Mapped[Status] = mapped_column(Enum(Status, create_constraint=True, native_enum=True), primary_key=True)
+    shard: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+# Numeração dos eventos do feed de mudanças (backend/changes.py): é o `id:` do
+# SSE e o cursor de retomada. O create_all só a cria no Postgres.
+ITEM_CHANGE_SEQ = Sequence('item_change_seq', metadata=Base.metadata)
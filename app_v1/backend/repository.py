@@ -1,57 +1,362 @@
 from __future__ import annotations
 
+import base64
 import uuid
-from typing import Sequence
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import (
+    TIMESTAMP, Dialect, Row, Select, String, TypeDecorator, case, delete, func, insert, literal, or_, select,
+    text, tuple_, type_coerce, update,
+)
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
 
-from .models import ItemORM
+from .changes import publish
+from .counters import counters_active
+from .models import SEARCH_CONFIG, ItemORM, ItemStatusCountORM, stored_timestamp
 from .schemas import ItemCreate, ItemUpdate
 from .enums import Status
 
 MAX_LIMIT = 200
 
-def list_items(session: Session, limit: int = 50, offset: int = 0, status: Status | None = None) -> Sequence[ItemORM]:
+# Colunas expostas pela API (RETURNING/SELECT sem carregar entidades ORM)
+ITEM_COLUMNS = (
+    ItemORM.id, ItemORM.title, ItemORM.description, ItemORM.status,
+    ItemORM.created_at, ItemORM.updated_at,
+)
+ITEM_FIELDS = {c.key: c for c in ITEM_COLUMNS}
+# Chave de ordenação/cursor: sempre selecionada, mesmo fora de `fields`
+CURSOR_FIELDS = ('created_at', 'id')
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """`fields=id,title,status` -> ('id', 'title', 'status'); None = todas as colunas."""
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [f for f in names if f not in ITEM_FIELDS]
+    if unknown or not names:
+        raise ValueError(f"fields inválido: {', '.join(unknown) or fields}; use {', '.join(ITEM_FIELDS)}")
+    return names
+
+def projected_columns(fields: Sequence[str] | None) -> tuple:
+    """Colunas do SELECT para uma projeção: as pedidas + a chave do cursor."""
+    if fields is None:
+        return ITEM_COLUMNS
+    return tuple(ITEM_FIELDS[f] for f in dict.fromkeys((*fields, *CURSOR_FIELDS)))
+
+def encode_cursor(obj: ItemORM) -> str:
+    """Cursor opaco (base64 url-safe) com a chave de ordenação (created_at, id) do último item."""
+    raw = f"{obj.created_at.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, id_ = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(id_)
+    except Exception:
+        raise ValueError('cursor inválido')
+
+class _StoredTimestamp(TypeDecorator):
+    """Bind de created_at/updated_at no formato em que o banco guardou a coluna.
+
+    No SQLite, server_default/onupdate (CURRENT_TIMESTAMP) gravam o texto
+    'YYYY-MM-DD HH:MM:SS' em UTC, sem fração; o DateTime do SQLAlchemy bindaria
+    '... .ffffff' e igualdade (If-Match) ou ordem (cursor) sairiam erradas.
+    Lá o bind sai com milissegundos, como models.stored_timestamp normaliza a
+    coluna. Nos demais bancos, TIMESTAMP. Valores sem fuso são UTC.
+    """
+    impl = TIMESTAMP(timezone=True)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Dialect) -> Any:
+        if dialect.name == 'sqlite':
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(TIMESTAMP(timezone=True))
+
+    def process_bind_param(self, value: datetime | None, dialect: Dialect) -> Any:
+        if value is None or dialect.name != 'sqlite':
+            return value
+        value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+        return f"{value:%Y-%m-%d %H:%M:%S}.{value.microsecond // 1000:03d}"
+
+def build_list_stmt(
+    limit: int = 50,
+    offset: int = 0,
+    status: Status | None = None,
+    cursor: str | None = None,
+) -> Select[tuple[ItemORM]]:
+    """SELECT de listagem compartilhado pelos repositórios sync e async."""
     if limit > MAX_LIMIT:
         limit = MAX_LIMIT
-    stmt = select(ItemORM).offset(offset).limit(limit).order_by(ItemORM.created_at.desc())
+    # Ordenação total (created_at, id) para paginação estável; casa com ix_items_created_at_id
+    stmt = select(ItemORM).order_by(ItemORM.created_at.desc(), ItemORM.id.desc()).limit(limit)
+    if status:
+        stmt = stmt.where(ItemORM.status == status)
+    if cursor:
+        # Keyset: custo independe da profundidade da página (sem OFFSET)
+        created_at, id_ = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(stored_timestamp(ItemORM.created_at), ItemORM.id) < tuple_(literal(created_at, _StoredTimestamp()), id_)
+        )
+    else:
+        stmt = stmt.offset(offset)
+    return stmt
+
+def list_items(
+    session: Session,
+    limit: int = 50,
+    offset: int = 0,
+    status: Status | None = None,
+    cursor: str | None = None,
+) -> Sequence[ItemORM]:
+    return session.execute(build_list_stmt(limit, offset, status, cursor)).scalars().all()
+
+# Variantes que selecionam só as colunas (Row): sem entidades ORM nem identity map.
+# Usadas pelo cache e pelo caminho de resposta rápida (FAST_JSON).
+
+def list_item_rows(
+    session: Session,
+    limit: int = 50,
+    offset: int = 0,
+    status: Status | None = None,
+    cursor: str | None = None,
+    fields: Sequence[str] | None = None,
+) -> Sequence[Row]:
+    # Com `fields`, colunas não pedidas (ex.: description, Text) nem saem do banco
+    stmt = build_list_stmt(limit, offset, status, cursor).with_only_columns(*projected_columns(fields))
+    return session.execute(stmt).all()
+
+def build_search_stmt(
+    dialect: str,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    status: Status | None = None,
+) -> Select:
+    """Busca textual ranqueada em title + description.
+
+    Postgres: search_vector @@ websearch_to_tsquery (aspas, OR, -termo), via GIN,
+    ordenado por ts_rank (título pesa mais que descrição). Outros bancos (SQLite
+    local): LIKE sem distinção de caixa, título antes de descrição.
+    """
+    if limit > MAX_LIMIT:
+        limit = MAX_LIMIT
+    if dialect == 'postgresql':
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        match = ItemORM.search_vector.bool_op('@@')(query)
+        rank = func.ts_rank(ItemORM.search_vector, query)
+    else:
+        pattern = '%' + q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        title_hit = ItemORM.title.ilike(pattern, escape='\\')
+        match = or_(title_hit, ItemORM.description.ilike(pattern, escape='\\'))
+        rank = case((title_hit, 2), else_=1)
+    stmt = (
+        select(*ITEM_COLUMNS).where(match)
+        # Desempate estável para a paginação por offset
+        .order_by(rank.desc(), ItemORM.created_at.desc(), ItemORM.id.desc())
+        .limit(limit).offset(offset)
+    )
+    if status:
+        stmt = stmt.where(ItemORM.status == status)
+    return stmt
+
+def search_item_rows(
+    session: Session,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    status: Status | None = None,
+) -> Sequence[Row]:
+    return session.execute(build_search_stmt(session.get_bind().dialect.name, q, limit, offset, status)).all()
+
+def get_item_row(session: Session, id: uuid.UUID) -> Row | None:
+    return session.execute(select(*ITEM_COLUMNS).where(ItemORM.id == id)).one_or_none()
+
+def iter_item_partitions(
+    session: Session,
+    status: Status | None = None,
+    chunk_size: int = 1000,
+) -> Iterator[Sequence[Row]]:
+    """Varre a tabela toda com cursor no servidor, `chunk_size` linhas por vez.
+
+    stream_results + yield_per: o driver não materializa o resultado, então a
+    memória fica limitada a um lote independentemente do tamanho da tabela.
+    """
+    stmt = select(*ITEM_COLUMNS).order_by(ItemORM.created_at, ItemORM.id)
+    if status:
+        stmt = stmt.where(ItemORM.status == status)
+    result = session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    yield from result.partitions()
+
+def build_list_version_stmt(status: Status | None = None) -> Select[tuple[datetime | None, int]]:
+    """max(updated_at) + count(*) do filtro: base do ETag de GET /items.
+
+    O count pega deletes (que não mexem no max); o max pega inserts e updates.
+    Percorre todas as linhas do filtro, por isso ItemCache o memoriza por geração.
+    """
+    stmt = select(func.max(ItemORM.updated_at), func.count())
     if status:
-        stmt = select(ItemORM).where(ItemORM.status == status).offset(offset).limit(limit).order_by(ItemORM.created_at.desc())
-    return session.execute(stmt).scalars().all()
+        stmt = stmt.where(ItemORM.status == status)
+    return stmt
+
+def get_list_version(session: Session, status: Status | None = None) -> Row:
+    return session.execute(build_list_version_stmt(status)).one()
+
+# Contagens O(1): item_status_counts é mantida por triggers (counters.py) no
+# Postgres; em outros bancos cai para COUNT(*) ... GROUP BY status.
+
+def build_status_counts_stmt(dialect: str) -> Select:
+    # Sem os triggers (counters.check_status_counters), a tabela de contadores não é confiável
+    if dialect == 'postgresql' and counters_active():
+        return select(ItemStatusCountORM.status, func.sum(ItemStatusCountORM.count)).group_by(ItemStatusCountORM.status)
+    return select(ItemORM.status, func.count()).group_by(ItemORM.status)
+
+# Estimativa do planner (atualizada por ANALYZE/autovacuum); -1 = nunca analisada
+ESTIMATED_TOTAL_STMT = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'items'::regclass")
+
+def status_counts(rows: Sequence[Row]) -> Dict[Status, int]:
+    counts = {s: 0 for s in Status}
+    counts.update({status: int(n) for status, n in rows})
+    return counts
+
+def get_status_counts(session: Session) -> Dict[Status, int]:
+    return status_counts(session.execute(build_status_counts_stmt(session.get_bind().dialect.name)).all())
+
+def estimate_total(session: Session) -> int | None:
+    if session.get_bind().dialect.name != 'postgresql':
+        return None
+    estimate = session.execute(ESTIMATED_TOTAL_STMT).scalar_one()
+    return estimate if estimate >= 0 else None
+
+def item_exists(session: Session, id: uuid.UUID) -> bool:
+    return session.execute(select(ItemORM.id).where(ItemORM.id == id)).first() is not None
 
 def get_item(session: Session, id: uuid.UUID) -> ItemORM | None:
     return session.get(ItemORM, id)
 
-def create_item(session: Session, data: ItemCreate) -> ItemORM:
-    obj = ItemORM(
+# Escritas unitárias: um único statement com RETURNING traz as colunas geradas
+# pelo servidor (created_at/updated_at) sem refresh. Retornam Row, que o commit
+# não expira.
+#
+# `if_match` (valores de updated_at aceitos, ver etags.if_match_versions) entra
+# no WHERE: concorrência otimista no mesmo statement, sem SELECT antes. Nenhuma
+# linha afetada significa "não existe" ou "versão mudou"; quem chama desambigua
+# com item_exists só nesse caso.
+#
+# Toda escrita que muda linhas publica os eventos do feed de mudanças
+# (changes.publish) antes do commit, na mesma transação.
+
+def build_create_stmt(data: ItemCreate) -> Executable:
+    return insert(ItemORM).values(
+        id=uuid.uuid4(),
         title=data.title,
         description=data.description,
         status=data.status or Status.pending,
+    ).returning(*ITEM_COLUMNS)
+
+def _item_criteria(id: uuid.UUID, if_match: Sequence[datetime] | None) -> list:
+    criteria = [ItemORM.id == id]
+    if if_match is not None:
+        criteria.append(type_coerce(stored_timestamp(ItemORM.updated_at), _StoredTimestamp()).in_(list(if_match)))
+    return criteria
+
+def build_update_stmt(id: uuid.UUID, data: ItemUpdate, if_match: Sequence[datetime] | None = None) -> Executable:
+    values = data.model_dump(exclude_none=True)
+    if not values:
+        # Nada a alterar: devolve o estado atual (ou nada, se não existir)
+        return select(*ITEM_COLUMNS).where(*_item_criteria(id, if_match))
+    return (
+        update(ItemORM).where(*_item_criteria(id, if_match)).values(values)
+        .returning(*ITEM_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+def build_delete_stmt(id: uuid.UUID, if_match: Sequence[datetime] | None = None) -> Executable:
+    return (
+        delete(ItemORM).where(*_item_criteria(id, if_match)).returning(ItemORM.id, ItemORM.status)
+        .execution_options(synchronize_session=False)
     )
-    session.add(obj)
+
+def create_item(session: Session, data: ItemCreate) -> Row:
+    row = session.execute(build_create_stmt(data)).one()
+    publish(session, 'create', [row])
     session.commit()
-    session.refresh(obj)
-    return obj
+    return row
 
-def update_item(session: Session, id: uuid.UUID, data: ItemUpdate) -> ItemORM | None:
-    obj = session.get(ItemORM, id)
-    if not obj:
-        return None
-    if data.title is not None:
-        obj.title = data.title
-    if data.description is not None:
-        obj.description = data.description
-    if data.status is not None:
-        obj.status = data.status
+def update_item(
+    session: Session, id: uuid.UUID, data: ItemUpdate, if_match: Sequence[datetime] | None = None,
+) -> Row | None:
+    row = session.execute(build_update_stmt(id, data, if_match)).one_or_none()
+    if row is not None and data.model_dump(exclude_none=True):
+        publish(session, 'update', [row])
     session.commit()
-    session.refresh(obj)
-    return obj
-
-def delete_item(session: Session, id: uuid.UUID) -> bool:
-    obj = session.get(ItemORM, id)
-    if not obj:
-        return False
-    session.delete(obj)
+    return row
+
+def delete_item(session: Session, id: uuid.UUID, if_match: Sequence[datetime] | None = None) -> bool:
+    deleted = session.execute(build_delete_stmt(id, if_match)).one_or_none()
+    if deleted is not None:
+        publish(session, 'delete', [deleted])
+    session.commit()
+    return deleted is not None
+
+# ---- Lote: uma transação, um round trip por grupo ---------------------------
+# Retornam Rows (não entidades ORM): o commit não as expira, então não há
+# SELECT de refresh por item depois.
+
+def create_items(session: Session, data: Sequence[ItemCreate]) -> list[Row]:
+    """INSERT multi-linha ... RETURNING, na ordem de `data`."""
+    if not data:
+        return []
+    params = [
+        {'id': uuid.uuid4(), 'title': d.title, 'description': d.description, 'status': d.status or Status.pending}
+        for d in data
+    ]
+    stmt = insert(ItemORM).returning(*ITEM_COLUMNS, sort_by_parameter_order=True)
+    rows = list(session.execute(stmt, params))
+    publish(session, 'create', rows)
+    session.commit()
+    return rows
+
+def update_items(session: Session, ops: Sequence[tuple[uuid.UUID, ItemUpdate]]) -> Dict[uuid.UUID, Row]:
+    """Agrupa operações com o mesmo conjunto de valores: um UPDATE ... WHERE id IN (...) RETURNING por grupo.
+
+    Retorna id -> linha atualizada; ids ausentes não existem.
+    """
+    groups: Dict[tuple, list[uuid.UUID]] = {}
+    for id, data in ops:
+        values = tuple(sorted(data.model_dump(exclude_none=True).items()))
+        groups.setdefault(values, []).append(id)
+    updated: Dict[uuid.UUID, Row] = {}
+    changed: list[Row] = []
+    for values, ids in groups.items():
+        if values:
+            stmt = (
+                update(ItemORM).where(ItemORM.id.in_(ids)).values(dict(values))
+                .returning(*ITEM_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            # Nada a alterar: só confirma existência
+            stmt = select(*ITEM_COLUMNS).where(ItemORM.id.in_(ids))
+        for row in session.execute(stmt):
+            updated[row.id] = row
+            if values:
+                changed.append(row)
+    publish(session, 'update', changed)
+    session.commit()
+    return updated
+
+def delete_items(session: Session, ids: Sequence[uuid.UUID]) -> set[uuid.UUID]:
+    """DELETE ... WHERE id IN (...) RETURNING id; retorna os ids removidos."""
+    if not ids:
+        return set()
+    stmt = (
+        delete(ItemORM).where(ItemORM.id.in_(list(ids))).returning(ItemORM.id, ItemORM.status)
+        .execution_options(synchronize_session=False)
+    )
+    rows = session.execute(stmt).all()
+    publish(session, 'delete', rows)
     session.commit()
-    return True
+    return {row.id for row in rows}
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Dict, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .changes import publish_async
+from .models import ItemORM
+from .schemas import ItemCreate, ItemUpdate
+from .enums import Status
+from .repository import (
+    ITEM_COLUMNS, build_create_stmt, build_delete_stmt, build_list_stmt, build_list_version_stmt, build_update_stmt,
+    build_status_counts_stmt, projected_columns, status_counts,
+)
+
+# Espelho de repository.py para o modo DB_ASYNC (mesmas assinaturas, com await)
+
+async def list_items(
+    session: AsyncSession,
+    limit: int = 50,
+    offset: int = 0,
+    status: Status | None = None,
+    cursor: str | None = None,
+) -> Sequence[ItemORM]:
+    result = await session.execute(build_list_stmt(limit, offset, status, cursor))
+    return result.scalars().all()
+
+async def get_item(session: AsyncSession, id: uuid.UUID) -> ItemORM | None:
+    return await session.get(ItemORM, id)
+
+async def list_item_rows(
+    session: AsyncSession,
+    limit: int = 50,
+    offset: int = 0,
+    status: Status | None = None,
+    cursor: str | None = None,
+    fields: Sequence[str] | None = None,
+) -> Sequence[Row]:
+    stmt = build_list_stmt(limit, offset, status, cursor).with_only_columns(*projected_columns(fields))
+    return (await session.execute(stmt)).all()
+
+async def get_item_row(session: AsyncSession, id: uuid.UUID) -> Row | None:
+    return (await session.execute(select(*ITEM_COLUMNS).where(ItemORM.id == id))).one_or_none()
+
+async def get_list_version(session: AsyncSession, status: Status | None = None) -> Row:
+    return (await session.execute(build_list_version_stmt(status))).one()
+
+async def get_status_counts(session: AsyncSession) -> Dict[Status, int]:
+    stmt = build_status_counts_stmt(session.get_bind().dialect.name)
+    return status_counts((await session.execute(stmt)).all())
+
+async def item_exists(session: AsyncSession, id: uuid.UUID) -> bool:
+    return (await session.execute(select(ItemORM.id).where(ItemORM.id == id))).first() is not None
+
+async def create_item(session: AsyncSession, data: ItemCreate) -> Row:
+    row = (await session.execute(build_create_stmt(data))).one()
+    await publish_async(session, 'create', [row])
+    await session.commit()
+    return row
+
+async def update_item(
+    session: AsyncSession, id: uuid.UUID, data: ItemUpdate, if_match: Sequence[datetime] | None = None,
+) -> Row | None:
+    row = (await session.execute(build_update_stmt(id, data, if_match))).one_or_none()
+    if row is not None and data.model_dump(exclude_none=True):
+        await publish_async(session, 'update', [row])
+    await session.commit()
+    return row
+
+async def delete_item(session: AsyncSession, id: uuid.UUID, if_match: Sequence[datetime] | None = None) -> bool:
+    deleted = (await session.execute(build_delete_stmt(id, if_match))).one_or_none()
+    if deleted is not None:
+        await publish_async(session, 'delete', [deleted])
+    await session.commit()
+    return deleted is not None
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import Row
+from starlette.responses import JSONResponse
+
+from .repository import encode_cursor
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional at runtime
+    orjson = None  # type: ignore
+
+
+def _default(obj: Any) -> Any:
+    # Tipos que o orjson não conhece; UUID, datetime e Enum ele serializa nativamente
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError
+
+
+def _json_default(obj: Any) -> Any:
+    # Fallback sem orjson: mesmos formatos que o orjson com OPT_UTC_Z
+    if isinstance(obj, datetime):
+        text = obj.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    return _default(obj)
+
+
+def _rows_as_dicts(content: Any) -> Any:
+    # Row é uma tupla: o json da stdlib a serializaria como lista antes do default
+    if isinstance(content, Row):
+        return content._asdict()
+    if isinstance(content, (list, tuple)):
+        return [o._asdict() if isinstance(o, Row) else o for o in content]
+    return content
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON via orjson direto de Rows/ItemOut, sem passar pelo response_model.
+
+    Mesmo formato de ItemOut: UUID como string, datetime ISO 8601 com "Z" para UTC,
+    Status pelo valor.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def render_json(content: Any) -> bytes:
+    """orjson quando instalado; senão json da stdlib com a mesma saída (mais lento)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        _rows_as_dicts(content), default=_json_default, ensure_ascii=False, separators=(',', ':'),
+    ).encode('utf-8')
+
+
+def project(items: Sequence[Any], fields: Sequence[str]) -> list[dict[str, Any]]:
+    """Só as chaves de `fields`, na ordem pedida (Row ou ItemOut)."""
+    return [{f: getattr(o, f) for f in fields} for o in items]
+
+
+@dataclass(frozen=True)
+class ListPage:
+    """Uma página de GET /items pronta para responder; é o que as requisições
+    coalescidas (backend/singleflight.py) compartilham."""
+    items: Sequence[Any]
+    next_cursor: str | None
+    # JSON já serializado (fields= ou FAST_JSON); None = o response_model serializa
+    body: bytes | None = None
+
+
+def list_page(items: Sequence[Any], limit: int, fields: Sequence[str] | None, fast_json: bool) -> ListPage:
+    # Página cheia: pode haver próxima; o cliente segue com ?cursor=<X-Next-Cursor>
+    next_cursor = encode_cursor(items[-1]) if len(items) == limit else None
+    if fields is not None:
+        # Fora do response_model (campos obrigatórios ausentes); o SELECT pode
+        # ter trazido a chave do cursor a mais
+        return ListPage(items, next_cursor, render_json(project(items, fields)))
+    if fast_json:
+        return ListPage(items, next_cursor, render_json(items))
+    return ListPage(items, next_cursor)
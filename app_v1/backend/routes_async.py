@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import uuid
+from typing import List
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .db import get_async_db
+from .schemas import ItemCreate, ItemOut, ItemUpdate
+from .repository import parse_fields
+from .repository_async import create_item, update_item, delete_item, get_status_counts, item_exists
+from .etags import etag_matches, if_match_versions, item_etag, not_modified
+from .cache import item_cache
+from .responses import FastJSONResponse, ListPage, list_page
+from .singleflight import list_flight_async
+from .enums import Status
+
+# Mesmos endpoints de main.py em async def: o round trip ao banco não ocupa
+# um slot do threadpool do AnyIO. Ativado com DB_ASYNC=true.
+settings = get_settings()
+router = APIRouter()
+
+@router.get("/items", response_model=List[ItemOut])
+async def api_list_items(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    status: Status | None = Query(None),
+    cursor: str | None = Query(None, description="Cursor opaco retornado em X-Next-Cursor"),
+    fields: str | None = Query(None, description="Projeção: colunas separadas por vírgula (ex.: id,title,status)"),
+    include_total: bool = Query(False, description="Devolve X-Total-Count (total do filtro de status)"),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use cursor ou offset, não ambos")
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {}
+    if settings.LIST_ETAG:
+        # Versão lida antes da página: numa escrita concorrente o ETag fica
+        # mais velho que o corpo (força novo GET), nunca mais novo
+        etag = await item_cache.list_etag_async(db, status)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        headers["ETag"] = etag
+
+    async def load() -> ListPage:
+        items = await item_cache.list_items_async(db, limit=limit, offset=offset, status=status, cursor=cursor, fields=projection)
+        return list_page(items, limit, projection, settings.FAST_JSON)
+
+    try:
+        # Requisições idênticas simultâneas esperam a mesma consulta + serialização;
+        # o ETag entra na chave para o corpo nunca ser mais velho que ele
+        page = await list_flight_async.do((limit, offset, status, cursor, projection, headers.get("ETag")), load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if include_total:
+        counts = await get_status_counts(db)
+        headers["X-Total-Count"] = str(counts[status] if status else sum(counts.values()))
+    if page.body is not None:
+        return Response(page.body, media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return page.items
+
+@router.get("/items/{item_id}", response_model=ItemOut)
+async def api_get_item(
+    item_id: uuid.UUID,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    obj = await item_cache.get_item_async(db, item_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Item não encontrado")
+    etag = item_etag(obj)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if settings.FAST_JSON:
+        return FastJSONResponse(obj, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return obj
+
+@router.post("/items", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
+async def api_create_item(payload: ItemCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
+    try:
+        obj = await create_item(db, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await item_cache.invalidate_async()
+    response.headers["ETag"] = item_etag(obj)
+    return obj
+
+# If-Match vai para o WHERE do UPDATE/DELETE; só quando nada é afetado há uma
+# segunda consulta, para responder 404 (não existe) ou 412 (versão mudou)
+
+@router.put("/items/{item_id}", response_model=ItemOut)
+async def api_update_item(
+    item_id: uuid.UUID,
+    payload: ItemUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    versions = if_match_versions(if_match)
+    obj = await update_item(db, item_id, payload, if_match=versions)
+    if not obj:
+        if versions is not None and await item_exists(db, item_id):
+            raise HTTPException(status_code=412, detail="Item modificado por outra requisição (ETag não confere)")
+        raise HTTPException(status_code=404, detail="Item não encontrado")
+    await item_cache.invalidate_async()
+    response.headers["ETag"] = item_etag(obj)
+    return obj
+
+@router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def api_delete_item(item_id: uuid.UUID, if_match: str | None = Header(None), db: AsyncSession = Depends(get_async_db)):
+    versions = if_match_versions(if_match)
+    ok = await delete_item(db, item_id, if_match=versions)
+    if not ok:
+        if versions is not None and await item_exists(db, item_id):
+            raise HTTPException(status_code=412, detail="Item modificado por outra requisição (ETag não confere)")
+        raise HTTPException(status_code=404, detail="Item não encontrado")
+    await item_cache.invalidate_async()
+    return None
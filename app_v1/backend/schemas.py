@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, field_validator
 
@@ -51,3 +51,32 @@ class ItemOut(ConfigUUIDModel):
 
     class Config:
         from_attributes = True
+
+class ItemStats(BaseModel):
+    total: int
+    by_status: Dict[Status, int]
+    # true: total veio das estatísticas do planner (pg_class.reltuples), não dos contadores
+    estimated: bool = False
+
+# ---- Operações em lote (/items:batch) ---------------------------------------
+
+class ItemBatchUpdateOp(ItemUpdate):
+    id: uuid.UUID
+
+class ItemBatchCreate(BaseModel):
+    items: List[ItemCreate]
+
+class ItemBatchUpdate(BaseModel):
+    items: List[ItemBatchUpdateOp]
+
+class ItemBatchDelete(BaseModel):
+    ids: List[uuid.UUID]
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: uuid.UUID
+    result: Literal['created', 'updated', 'deleted', 'not_found']
+    item: ItemOut | None = None
+
+class BatchResult(BaseModel):
+    results: List[BatchItemResult]
@@ -0,0 +1,50 @@
+"""Modo produção: dimensionamento de workers e worker Uvicorn do Gunicorn.
+
+Usado por `backend/gunicorn_conf.py` (ver Dockerfile):
+
+    gunicorn -c python:backend.gunicorn_conf backend.main:app
+"""
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+
+from uvicorn_worker import UvicornWorker
+
+
+def cgroup_cpu_limit() -> float | None:
+    """Cota de CPU do container (cgroup v2 `cpu.max` ou v1 `cfs_quota/period`); None se ilimitada."""
+    cpu_max = Path('/sys/fs/cgroup/cpu.max')
+    try:
+        if cpu_max.exists():
+            quota, period = cpu_max.read_text().split()[:2]
+            return None if quota == 'max' else int(quota) / int(period)
+        quota_us = int(Path('/sys/fs/cgroup/cpu/cpu.cfs_quota_us').read_text())
+        period_us = int(Path('/sys/fs/cgroup/cpu/cpu.cfs_period_us').read_text())
+        return None if quota_us <= 0 else quota_us / period_us
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> float:
+    """CPUs utilizáveis: afinidade do processo limitada pela cota do cgroup."""
+    cpus = float(len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1)
+    limit = cgroup_cpu_limit()
+    return min(cpus, limit) if limit is not None else cpus
+
+
+def default_workers() -> int:
+    """Um worker por CPU da cota (arredondado para cima): workers async não se beneficiam de 2N+1."""
+    return max(math.ceil(available_cpus()), 1)
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """Worker Uvicorn com uvloop + httptools explícitos (falha no boot se não estiverem instalados).
+
+    Sem o access log do próprio Uvicorn: a linha de acesso sai só do ObservabilityMiddleware.
+    """
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS, 'loop': 'uvloop', 'http': 'httptools', 'access_log': False,
+    }
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from .config import get_settings
+from .metrics import singleflight_requests_total
+
+T = TypeVar('T')
+
+# Coalescência de leituras idênticas concorrentes (single-flight): a primeira
+# requisição com uma chave executa a função (leader); as que chegam enquanto
+# ela está em andamento esperam e recebem o mesmo resultado ou a mesma exceção
+# (followers). Não é cache: o resultado é descartado quando a chamada termina.
+#
+# forget() é chamado a cada escrita (ItemCache.invalidate): uma leitura que
+# começa depois de uma escrita deste processo nunca se junta a uma consulta
+# iniciada antes dela.
+
+
+class _Call:
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Versão para handlers sync (threads do threadpool)."""
+
+    def __init__(self, name: str, enabled: bool = True) -> None:
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._epoch = 0
+
+    def forget(self) -> None:
+        with self._lock:
+            self._epoch += 1
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            flight_key = (self._epoch, key)
+            call = self._calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = self._calls[flight_key] = _Call()
+        if not leader:
+            singleflight_requests_total.labels(name=self.name, role='follower').inc()
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        singleflight_requests_total.labels(name=self.name, role='leader').inc()
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
+            call.event.set()
+        return call.value
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class AsyncSingleFlight:
+    """Versão para handlers async: followers aguardam um Future no mesmo event loop.
+
+    O leader executa no contexto da própria requisição (usa a sessão dela). Se
+    ele for cancelado (cliente desconectou), os followers não herdam o
+    cancelamento: um deles vira o novo leader e refaz a consulta.
+    """
+
+    def __init__(self, name: str, enabled: bool = True) -> None:
+        self.name = name
+        self.enabled = enabled
+        self._calls: Dict[Hashable, asyncio.Future[Any]] = {}
+        self._epoch = 0
+
+    def forget(self) -> None:
+        self._epoch += 1
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.enabled:
+            return await fn()
+        while True:
+            flight_key = (self._epoch, key)
+            fut = self._calls.get(flight_key)
+            if fut is None:
+                break
+            singleflight_requests_total.labels(name=self.name, role='follower').inc()
+            try:
+                # shield: cancelar um follower não cancela o Future compartilhado
+                return await asyncio.shield(fut)
+            except _LeaderCancelled:
+                continue
+        fut = asyncio.get_running_loop().create_future()
+        self._calls[flight_key] = fut
+        singleflight_requests_total.labels(name=self.name, role='leader').inc()
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            _fail(fut, _LeaderCancelled())
+            raise
+        except BaseException as e:
+            _fail(fut, e)
+            raise
+        else:
+            fut.set_result(value)
+            return value
+        finally:
+            del self._calls[flight_key]
+
+
+def _fail(fut: asyncio.Future[Any], error: BaseException) -> None:
+    fut.set_exception(error)
+    # Marca como lida: sem followers, o asyncio avisaria "exception was never retrieved"
+    fut.exception()
+
+
+# GET /items: chave = consulta normalizada (limit, offset, status, cursor, fields)
+_settings = get_settings()
+list_flight = SingleFlight('list', enabled=_settings.SINGLE_FLIGHT_ENABLED)
+list_flight_async = AsyncSingleFlight('list', enabled=_settings.SINGLE_FLIGHT_ENABLED)
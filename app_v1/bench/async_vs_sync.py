@@ -0,0 +1,57 @@
+"""Throughput/latência do modo sync (threadpool) vs DB_ASYNC=true na mesma concorrência.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um Postgres de teste):
+
+    python -m bench.async_vs_sync --concurrency 50 --duration 20
+
+Cada modo sobe seu próprio uvicorn (1 worker) e recebe os cenários do k6
+`test_crud.js`: `listItems` (GET /items?limit=20) e `crudFlow` (create → get → update → delete).
+"""
+from __future__ import annotations
+
+import argparse
+import uuid
+from typing import Dict, List
+
+import httpx
+
+from backend.db import engine
+
+from .common import http_load, print_table, run_server, seed_items
+
+
+async def list_items(client: httpx.AsyncClient) -> bool:
+    r = await client.get("/items", params={"limit": 20})
+    return r.status_code == 200
+
+
+async def crud_flow(client: httpx.AsyncClient) -> bool:
+    r = await client.post("/items", json={"title": f"bench-{uuid.uuid4()}", "description": "bench", "status": "pending"})
+    if r.status_code != 201:
+        return False
+    item_id = r.json()["id"]
+    ok = (await client.get(f"/items/{item_id}")).status_code == 200
+    ok &= (await client.put(f"/items/{item_id}", json={"status": "done"})).status_code == 200
+    ok &= (await client.delete(f"/items/{item_id}")).status_code == 204
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    seed_items(engine, args.rows)
+    rows: List[Dict[str, object]] = []
+    for mode in ("false", "true"):
+        with run_server({"DB_ASYNC": mode}) as server:
+            for name, scenario in (("listItems", list_items), ("crudFlow", crud_flow)):
+                stats = http_load(server.url, scenario, args.concurrency, args.duration)
+                rows.append({"DB_ASYNC": mode, "scenario": name, "concurrency": args.concurrency, **stats})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Memória por conexão e latência de fan-out de GET /items/changes (SSE) com muitos assinantes ociosos.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um Postgres de teste):
+
+    python -m bench.changes_sse --subscribers 1000 --events 50
+
+Para cada modo (sync e DB_ASYNC=true) sobe um uvicorn, abre `--subscribers`
+conexões SSE (sockets crus, sem cliente HTTP por conexão) e mede o RSS do
+servidor antes, com as conexões ociosas e depois de fechá-las. Em seguida faz
+`--events` POST /items, um por vez, e mede do início do POST até o evento
+chegar em cada assinante (`first` = primeiro assinante, `last` = o último:
+inclui o commit, o NOTIFY, o LISTEN e o fan-out para todos).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import httpx
+
+from .common import Server, print_table, run_server, summarize
+
+MB = 1024 * 1024
+
+
+async def _subscribe(host: str, port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /items/changes HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    headers = await reader.readuntil(b"\r\n\r\n")
+    if not headers.startswith(b"HTTP/1.1 200"):
+        raise RuntimeError(headers.decode(errors="replace"))
+    return reader, writer
+
+
+async def _next_change(reader: asyncio.StreamReader) -> float:
+    # Chunked: os frames chegam inteiros; basta achar a linha do evento
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise RuntimeError("conexão SSE fechada")
+        if line.startswith(b"event: change"):
+            return time.perf_counter()
+
+
+async def _run(server: Server, subscribers: int, events: int) -> Dict[str, object]:
+    parts = urlsplit(server.url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    await asyncio.sleep(1.0)
+    base_rss = server.rss_bytes() / MB
+
+    conns = []
+    for i in range(0, subscribers, 100):
+        conns += await asyncio.gather(*(_subscribe(host, port) for _ in range(min(100, subscribers - i))))
+    await asyncio.sleep(1.0)
+    idle_rss = server.rss_bytes() / MB
+
+    first: List[float] = []
+    last: List[float] = []
+    async with httpx.AsyncClient(base_url=server.url, timeout=30) as client:
+        for n in range(events):
+            waiters = [asyncio.create_task(_next_change(reader)) for reader, _ in conns]
+            start = time.perf_counter()
+            r = await client.post("/items", json={"title": f"bench-sse-{n}"})
+            r.raise_for_status()
+            arrivals = await asyncio.gather(*waiters)
+            first.append((min(arrivals) - start) * 1000)
+            last.append((max(arrivals) - start) * 1000)
+
+    for _, writer in conns:
+        writer.close()
+    await asyncio.sleep(2.0)
+    closed_rss = server.rss_bytes() / MB
+    return {
+        "base_rss_mb": base_rss,
+        "idle_rss_mb": idle_rss,
+        "kb_per_conn": (idle_rss - base_rss) * 1024 / subscribers,
+        "closed_rss_mb": closed_rss,
+        "first_p50_ms": summarize(first)["p50_ms"],
+        "last_p50_ms": summarize(last)["p50_ms"],
+        "last_p95_ms": summarize(last)["p95_ms"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+
+    rows: List[Dict[str, object]] = []
+    for mode in ("false", "true"):
+        with run_server({"DB_ASYNC": mode, "ACCESS_LOG_ENABLED": "false"}) as server:
+            stats = asyncio.run(_run(server, args.subscribers, args.events))
+            rows.append({"DB_ASYNC": mode, "subscribers": args.subscribers, **stats})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Utilitários compartilhados pelos benchmarks (rodar a partir de app_v1/).
+
+Os benchmarks usam o mesmo `DATABASE_URL` do backend. Use um banco dedicado:
+alguns scripts removem/recriam índices e inserem milhões de linhas.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Sequence
+
+import httpx
+from sqlalchemy import Engine, func, select, text
+
+from backend.models import Base, ItemORM
+
+
+def seed_items(engine: Engine, n: int) -> int:
+    """Garante pelo menos `n` linhas em items (generate_series no Postgres). Retorna o total."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        current = conn.execute(select(func.count()).select_from(ItemORM)).scalar_one()
+        missing = n - current
+        if missing > 0:
+            conn.execute(text(
+                "INSERT INTO items (id, title, description, status, created_at, updated_at) "
+                "SELECT gen_random_uuid(), 'item-' || g, repeat('lorem ipsum dolor ', 8), "
+                "(ARRAY['pending','in_progress','done'])[1 + g % 3]::status, "
+                "now() - make_interval(secs => g), now() "
+                "FROM generate_series(1, :n) AS g"
+            ), {"n": missing})
+            conn.execute(text("ANALYZE items"))
+        return max(current, n)
+
+
+def measure(fn: Callable[[], object], repeat: int = 50, warmup: int = 5) -> Dict[str, float]:
+    """Executa `fn` e devolve latências em ms (p50/p95/média)."""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def print_table(rows: List[Dict[str, object]]) -> None:
+    if not rows:
+        return
+    cols = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(_fmt(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(_fmt(r[c]).ljust(widths[c]) for c in cols))
+
+
+def _fmt(v: object) -> str:
+    return f"{v:.2f}" if isinstance(v, float) else str(v)
+
+
+# ---- Carga HTTP --------------------------------------------------------------
+
+@dataclass
+class Server:
+    url: str
+    pid: int
+    startup_seconds: float = 0.0  # Popen -> primeiro 200 em /items
+
+    def cpu_seconds(self) -> float:
+        """CPU (user + system) consumida pelo processo do servidor até agora (Linux, /proc)."""
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss_bytes(self) -> int:
+        """Memória residente (VmRSS) do processo do servidor (Linux, /proc)."""
+        for line in Path(f"/proc/{self.pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+        raise RuntimeError("VmRSS indisponível")
+
+
+@contextlib.contextmanager
+def run_server(env: Dict[str, str] | None = None, args: Sequence[str] = (),
+               poll_interval: float = 0.2) -> Iterator[Server]:
+    """Sobe `uvicorn backend.main:app` num subprocesso e devolve URL base + pid."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc_env = {**os.environ, "OPENSEARCH_ENABLED": "false", **(env or {})}
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log", *args],
+        env=proc_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                if httpx.get(f"{base_url}/items?limit=1", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None or time.time() > deadline:
+                raise RuntimeError("servidor não subiu")
+            time.sleep(poll_interval)
+        yield Server(url=base_url, pid=proc.pid, startup_seconds=time.perf_counter() - started)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+async def _worker(client: httpx.AsyncClient, scenario: Callable[[httpx.AsyncClient], Awaitable[bool]],
+                  until: float, samples: List[float], errors: List[int]) -> None:
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        try:
+            ok = await scenario(client)
+        except httpx.HTTPError:
+            ok = False
+        samples.append((time.perf_counter() - start) * 1000)
+        if not ok:
+            errors.append(1)
+
+
+def http_load(base_url: str, scenario: Callable[[httpx.AsyncClient], Awaitable[bool]],
+              concurrency: int = 50, duration: float = 20.0) -> Dict[str, float]:
+    """Roda `scenario` em loop fechado com `concurrency` clientes (como VUs do k6, sem sleep)."""
+    async def _run() -> Dict[str, float]:
+        samples: List[float] = []
+        errors: List[int] = []
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            until = time.perf_counter() + duration
+            await asyncio.gather(*(_worker(client, scenario, until, samples, errors) for _ in range(concurrency)))
+        samples.sort()
+        return {
+            "rps": len(samples) / duration,
+            "p50_ms": samples[len(samples) // 2] if samples else 0.0,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0,
+            "errors": float(len(errors)),
+        }
+    return asyncio.run(_run())
+
+
+# ---- ASGI em processo --------------------------------------------------------
+
+def asgi_requests(app: Callable[..., Awaitable[None]], paths: Sequence[str], method: str = "GET") -> List[float]:
+    """Chama o app ASGI direto (sem socket/servidor) e devolve a latência de cada request em µs.
+
+    Mede só o custo da pilha ASGI (middlewares + roteamento + handler), sem ruído de rede.
+    """
+    async def _run() -> List[float]:
+        async def receive() -> Dict[str, object]:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Dict[str, object]) -> None:
+            return None
+
+        samples: List[float] = []
+        for path in paths:
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+                "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+                "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+            }
+            start = time.perf_counter()
+            await app(scope, receive, send)
+            samples.append((time.perf_counter() - start) * 1e6)
+        return samples
+    return asyncio.run(_run())
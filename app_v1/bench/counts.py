@@ -0,0 +1,101 @@
+"""Latência das contagens conforme a tabela cresce: COUNT(*) vs. contadores por status vs. estimativa.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um Postgres de teste):
+
+    python -m bench.counts --sizes 100000 300000 1000000
+
+Para cada tamanho, semeia `items` até lá (os triggers de `backend/counters.py`
+acompanham a carga) e mede `COUNT(*)` total e por status, `get_status_counts`
+(soma de item_status_counts) e `estimate_total` (pg_class.reltuples), conferindo
+que os contadores batem com o COUNT(*). No fim mede o custo dos triggers por
+escrita: `create_item` + `delete_item` com os triggers ligados e desligados.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+from sqlalchemy import func, select, text
+
+from backend.counters import check_status_counters, ensure_status_counters
+from backend.db import SessionLocal, engine, ensure_columns
+from backend.enums import Status
+from backend.models import Base, ItemORM
+from backend.repository import create_item, delete_item, estimate_total, get_status_counts
+from backend.schemas import ItemCreate
+
+from .common import measure, print_table, seed_items, summarize
+
+
+def _counts(total: int, repeat: int) -> List[Dict[str, object]]:
+    rows: List[Dict[str, object]] = []
+    with SessionLocal() as session:
+        exact = session.execute(select(func.count()).select_from(ItemORM)).scalar_one()
+        counters = get_status_counts(session)
+        assert sum(counters.values()) == exact, (counters, exact)
+        scenarios = {
+            "count_star": lambda: session.execute(select(func.count()).select_from(ItemORM)).scalar_one(),
+            "count_star_status": lambda: session.execute(
+                select(func.count()).select_from(ItemORM).where(ItemORM.status == Status.done)).scalar_one(),
+            "status_counters": lambda: get_status_counts(session),
+            "estimated": lambda: estimate_total(session),
+        }
+        for name, fn in scenarios.items():
+            rows.append({"rows": total, "method": name, **measure(fn, repeat=repeat, warmup=2)})
+            session.rollback()
+    return rows
+
+
+def _write_overhead(repeat: int) -> List[Dict[str, object]]:
+    def create_delete() -> float:
+        with SessionLocal() as session:
+            start = time.perf_counter()
+            row = create_item(session, ItemCreate(title="bench-counts"))
+            delete_item(session, row.id)
+            return (time.perf_counter() - start) * 1000
+
+    rows: List[Dict[str, object]] = []
+    for phase in ("com_triggers", "sem_triggers"):
+        if phase == "sem_triggers":
+            # Cria e apaga as mesmas linhas: os contadores continuam corretos
+            with engine.begin() as conn:
+                conn.execute(text("ALTER TABLE items DISABLE TRIGGER USER"))
+        try:
+            for _ in range(10):
+                create_delete()
+            rows.append({"rows": "-", "method": f"create+delete {phase}",
+                         **summarize([create_delete() for _ in range(repeat)])})
+        finally:
+            if phase == "sem_triggers":
+                with engine.begin() as conn:
+                    conn.execute(text("ALTER TABLE items ENABLE TRIGGER USER"))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Benchmark requer Postgres (DATABASE_URL=postgresql+psycopg://...)")
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine, Base.metadata, add_generated=True)
+    ensure_status_counters(engine)
+    check_status_counters(engine)
+
+    results: List[Dict[str, object]] = []
+    for size in sorted(args.sizes):
+        total = seed_items(engine, size)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE items"))
+        results += _counts(total, args.repeat)
+    results += _write_overhead(args.repeat * 5)
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Servidor `_bulk` falso (em processo) para medir o envio de logs sem cluster.
+
+Aceita `POST /_bulk` e `POST /<index>/_bulk` (com ou sem `Content-Encoding: gzip`),
+conta documentos e bytes e responde como o OpenSearch. `latency_ms` simula o
+tempo de indexação e `fail_rate` a fração de requisições respondidas com 503.
+
+Latência ponta a ponta: para o primeiro e o último doc de cada `_bulk` aceito,
+guarda `agora - timestamp` do doc (o campo gravado pelo UtcIsoTimeFormatter).
+"""
+from __future__ import annotations
+
+import contextlib
+import gzip
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+
+@dataclass
+class FakeOpenSearch:
+    host: str
+    port: int
+    latency_ms: float = 0.0
+    fail_rate: float = 0.0
+    docs: int = 0
+    requests: int = 0
+    failed_requests: int = 0
+    wire_bytes: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, body: bytes, wire_bytes: int, failed: bool) -> None:
+        lines = body.splitlines()
+        latencies = [] if failed else [_age_ms(lines[i]) for i in {1, len(lines) - 1} if 0 < i < len(lines)]
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += wire_bytes
+            if failed:
+                self.failed_requests += 1
+            else:
+                self.docs += len(lines) // 2
+                self.latencies_ms.extend(lat for lat in latencies if lat is not None)
+
+
+def _age_ms(source: bytes) -> float | None:
+    try:
+        ts = json.loads(source)["timestamp"]
+    except (ValueError, KeyError):
+        return None
+    return (time.time() - datetime.fromisoformat(ts).timestamp()) * 1000
+
+
+def _handler(state: FakeOpenSearch) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            return None
+
+        def _reply(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_HEAD(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self) -> None:
+            self._reply(200, {"version": {"distribution": "opensearch", "number": "2.11.0"}})
+
+        def do_POST(self) -> None:
+            raw = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+            if not self.path.split("?")[0].endswith("/_bulk"):
+                self._reply(404, {"error": "not found"})
+                return
+            body = gzip.decompress(raw) if self.headers.get("Content-Encoding") == "gzip" else raw
+            if state.latency_ms:
+                time.sleep(state.latency_ms / 1000)
+            failed = random.random() < state.fail_rate
+            state.record(body, len(raw), failed)
+            if failed:
+                self._reply(503, {"error": "unavailable"})
+            else:
+                # errors=false: o cliente não olha items, então não precisamos montá-los
+                self._reply(200, {"took": 1, "errors": False, "items": []})
+
+        do_PUT = do_POST
+
+    return Handler
+
+
+@contextlib.contextmanager
+def fake_opensearch(latency_ms: float = 0.0, fail_rate: float = 0.0) -> Iterator[FakeOpenSearch]:
+    state = FakeOpenSearch(host="127.0.0.1", port=0, latency_ms=latency_ms, fail_rate=fail_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state))
+    server.daemon_threads = True
+    state.port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, name="fake-opensearch", daemon=True)
+    thread.start()
+    try:
+        yield state
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,67 @@
+"""Rajada de GET /items?limit=20 idênticos (cenário `listItems` do k6) com e sem single-flight.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um Postgres de teste):
+
+    python -m bench.list_coalescing --concurrency 50 --duration 20
+
+Para cada modo (sync e DB_ASYNC=true) e SINGLE_FLIGHT_ENABLED false/true, sobe
+um uvicorn e roda `--concurrency` clientes pedindo a mesma página. `queries` é
+quantas vezes a página foi de fato buscada (leaders, ou todas as requisições
+sem coalescência) e `coalesced` a fração atendida por uma consulta já em
+andamento, lidas de `singleflight_requests_total` em /metrics.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from typing import Dict, List
+
+import httpx
+
+from backend.db import engine
+
+from .common import http_load, print_table, run_server, seed_items
+
+ROLE_RE = re.compile(r'^singleflight_requests_total\{name="list",role="(\w+)"\} ([0-9.e+]+)$', re.M)
+
+
+def _roles(base_url: str) -> Dict[str, float]:
+    text = httpx.get(f"{base_url}/metrics/", timeout=10).text
+    return {role: float(value) for role, value in ROLE_RE.findall(text)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    seed_items(engine, args.rows)
+
+    async def list_page(client: httpx.AsyncClient) -> bool:
+        r = await client.get("/items", params={"limit": args.limit})
+        return r.status_code == 200
+
+    rows: List[Dict[str, object]] = []
+    for mode in ("false", "true"):
+        for flight in ("false", "true"):
+            env = {"DB_ASYNC": mode, "SINGLE_FLIGHT_ENABLED": flight, "CACHE_BACKEND": "none",
+                   "ACCESS_LOG_ENABLED": "false"}
+            with run_server(env) as server:
+                cpu_before = server.cpu_seconds()
+                stats = http_load(server.url, list_page, args.concurrency, args.duration)
+                cpu = server.cpu_seconds() - cpu_before
+                roles = _roles(server.url)
+            requests = stats["rps"] * args.duration
+            queries = roles.get("leader", 0.0) if flight == "true" else requests
+            followers = roles.get("follower", 0.0)
+            rows.append({"DB_ASYNC": mode, "single_flight": flight, **stats, "queries": int(queries),
+                         "coalesced": followers / (followers + queries) if flight == "true" and queries else 0.0,
+                         "cpu_s": cpu})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Planos e latência de `repository.list_items` antes/depois dos índices compostos.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um Postgres de teste):
+
+    python -m bench.list_indexes --rows 1000000
+
+O script semeia a tabela, remove os índices declarados em ItemORM, mede os cenários
+do k6 (primeira página, filtro por status, página profunda por offset e por cursor),
+recria os índices via `ensure_indexes` e mede de novo.
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from backend.db import SessionLocal, engine, ensure_indexes
+from backend.enums import Status
+from backend.models import Base, ItemORM
+from backend.repository import encode_cursor, list_items
+
+from .common import measure, print_table, seed_items
+
+
+def _scenarios(session: Session, deep: int) -> Dict[str, Callable[[], object]]:
+    deep_cursor = encode_cursor(list_items(session, limit=1, offset=deep)[0])
+    return {
+        "first_page": lambda: list_items(session, limit=20),
+        "status_page": lambda: list_items(session, limit=20, status=Status.done),
+        f"offset_{deep}": lambda: list_items(session, limit=20, offset=deep),
+        f"cursor_{deep}": lambda: list_items(session, limit=20, cursor=deep_cursor),
+    }
+
+
+def _explain(fn: Callable[[], object]) -> str:
+    """Captura o SQL emitido por `fn` e roda EXPLAIN (ANALYZE, BUFFERS) com os mesmos parâmetros."""
+    captured: List[Tuple[str, object]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    statement, parameters = captured[-1]
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+        return "\n".join(row[0] for row in cur.fetchall())
+    finally:
+        raw.close()
+
+
+def _run(phase: str, deep: int, repeat: int, show_plans: bool) -> List[Dict[str, object]]:
+    rows: List[Dict[str, object]] = []
+    with SessionLocal() as session:
+        for name, fn in _scenarios(session, deep).items():
+            plan = _explain(fn)
+            if show_plans:
+                print(f"--- {phase} / {name}\n{plan}\n")
+            stats = measure(fn, repeat=repeat)
+            rows.append({"phase": phase, "scenario": name, **stats,
+                         "seq_scan": "Seq Scan" in plan, "sort": "Sort Key" in plan})
+            session.expunge_all()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--deep", type=int, default=50_000, help="profundidade da página profunda")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--plans", action="store_true", help="imprime os planos completos")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Benchmark requer Postgres (DATABASE_URL=postgresql+psycopg://...)")
+
+    total = seed_items(engine, args.rows)
+    print(f"items: {total} linhas")
+
+    index_names = [idx.name for idx in ItemORM.__table__.indexes]
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name in index_names:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+        conn.execute(text("ANALYZE items"))
+    before = _run("sem_indices", args.deep, args.repeat, args.plans)
+
+    ensure_indexes(engine, Base.metadata)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE items"))
+    after = _run("com_indices", args.deep, args.repeat, args.plans)
+
+    print_table(before + after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Requests/s por core em GET /items?limit=200: response_model (Pydantic) vs FAST_JSON (Row -> orjson).
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um banco de teste):
+
+    python -m bench.list_serialization --concurrency 16 --duration 20
+
+"rps/core" = requisições atendidas / segundos de CPU do processo do servidor,
+o que isola o custo de serialização da quantidade de cores da máquina.
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Dict, List
+
+import httpx
+
+from backend.db import engine
+
+from .common import http_load, print_table, run_server, seed_items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    seed_items(engine, args.limit * 10)
+
+    async def list_page(client: httpx.AsyncClient) -> bool:
+        r = await client.get("/items", params={"limit": args.limit})
+        return r.status_code == 200
+
+    rows: List[Dict[str, object]] = []
+    for fast in ("false", "true"):
+        with run_server({"FAST_JSON": fast, "CACHE_BACKEND": "none"}) as server:
+            cpu_before = server.cpu_seconds()
+            stats = http_load(server.url, list_page, args.concurrency, args.duration)
+            cpu = server.cpu_seconds() - cpu_before
+        requests = stats["rps"] * args.duration
+        rows.append({"FAST_JSON": fast, "limit": args.limit, **stats,
+                     "cpu_s": cpu, "rps_per_core": requests / cpu if cpu else 0.0})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Pipeline de logs completo (`setup_logging()`) em taxas controladas, contra o `_bulk` falso.
+
+Uso (a partir de app_v1/; não precisa de banco, OpenSearch nem rede):
+
+    python -m bench.log_pipeline --rates 1000 5000 10000 --duration 10
+
+Para cada taxa: chama `setup_logging()` com o OpenSearchHandler apontando para
+`bench/fake_opensearch.py`, emite linhas de access log em `uvicorn.access` (como o
+ObservabilityMiddleware) e reporta:
+
+- latência ponta a ponta (criação do registro -> `_bulk` aceito), p50/p95/max;
+- profundidade das filas (QueueListener e OpenSearch), média e máxima;
+- taxa de descarte (fila do listener cheia + rejeitados) e docs no spill;
+- CPU por registro: `emit_us` na thread que loga (custo no request) e `pipeline_us`
+  nas threads do listener e do envio ao OpenSearch (via /proc, Linux).
+
+O stdout do StreamHandler vai para /dev/null, mas a formatação JSON é medida.
+Variáveis do backend (ACCESS_LOG_SAMPLE_RATE, LOG_BULK_*, LOG_QUEUE_SIZE...) valem normalmente.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from backend import logging_conf
+from backend.metrics import log_records_dropped_total, log_shipper_records_total
+
+from .common import print_table
+from .fake_opensearch import fake_opensearch
+from .log_shipping import emit_at_rate
+
+
+def _counter(metric, outcome: str | None = None) -> float:  # type: ignore[no-untyped-def]
+    return sum(s.value for m in metric.collect() for s in m.samples
+               if s.name.endswith("_total") and (outcome is None or s.labels.get("outcome") == outcome))
+
+
+def _thread_cpu(threads: Iterable[threading.Thread]) -> float:
+    """CPU (user + system) das threads, em segundos, lida de /proc/self/task/<tid>/stat."""
+    total = 0
+    for thread in threads:
+        stat = Path(f"/proc/self/task/{thread.native_id}/stat")
+        if thread.native_id is None or not stat.exists():
+            continue
+        fields = stat.read_text().rsplit(")", 1)[1].split()
+        total += int(fields[11]) + int(fields[12])
+    return total / os.sysconf("SC_CLK_TCK")
+
+
+def _pipeline_threads() -> List[threading.Thread]:
+    listener = logging_conf._listener
+    assert listener is not None
+    threads = [listener._thread] if listener._thread else []
+    for handler in listener.handlers:
+        threads.extend(getattr(handler, "_threads", []))
+    return threads
+
+
+def _pct(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] if samples else 0.0
+
+
+def run(rate: float, args: argparse.Namespace, devnull) -> Dict[str, object]:  # type: ignore[no-untyped-def]
+    with fake_opensearch(latency_ms=args.latency_ms, fail_rate=args.fail_rate) as server, \
+            tempfile.TemporaryDirectory() as spill_dir:
+        os.environ.update({"OPENSEARCH_ENABLED": "true", "OPENSEARCH_HOST": server.host,
+                           "OPENSEARCH_PORT": str(server.port), "LOG_SPILL_DIR": spill_dir})
+        with contextlib.redirect_stderr(devnull):
+            logging_conf.setup_logging()
+        listener = logging_conf._listener
+        assert listener is not None
+        os_handler = next(h for h in listener.handlers if isinstance(h, logging_conf.OpenSearchHandler))
+        threads = _pipeline_threads()
+
+        depths: List[int] = []
+        shipper_depths: List[int] = []
+        stop = threading.Event()
+
+        def sample_depths() -> None:
+            while not stop.wait(0.05):
+                depths.append(listener.queue.qsize())
+                shipper_depths.append(os_handler._q.qsize())
+
+        sampler = threading.Thread(target=sample_depths, daemon=True)
+        sampler.start()
+        dropped_before = _counter(log_records_dropped_total) + _counter(log_shipper_records_total, "dropped")
+        spilled_before = _counter(log_shipper_records_total, "spilled")
+        cpu_before = _thread_cpu(threads)
+        emit_cpu_before = time.thread_time()
+
+        emitted = emit_at_rate(logging.getLogger("uvicorn.access"), rate, args.duration)
+        emit_cpu = time.thread_time() - emit_cpu_before
+
+        deadline = time.time() + args.drain
+        while server.docs < emitted and time.time() < deadline:
+            time.sleep(0.1)
+        stop.set()
+        sampler.join()
+        pipeline_cpu = _thread_cpu(threads) - cpu_before
+        dropped = _counter(log_records_dropped_total) + _counter(log_shipper_records_total, "dropped") - dropped_before
+        spilled = _counter(log_shipper_records_total, "spilled") - spilled_before
+        latencies = server.latencies_ms
+        delivered = server.docs
+
+    return {
+        "rate": int(rate), "emitted": emitted, "delivered": delivered,
+        "lat_p50_ms": _pct(latencies, 0.5), "lat_p95_ms": _pct(latencies, 0.95),
+        "lat_max_ms": max(latencies, default=0.0),
+        "q_mean": statistics.fmean(depths) if depths else 0.0, "q_max": max(depths, default=0),
+        "os_q_max": max(shipper_depths, default=0),
+        "drop_pct": 100 * dropped / emitted if emitted else 0.0, "spilled": int(spilled),
+        "emit_us": emit_cpu / emitted * 1e6 if emitted else 0.0,
+        "pipeline_us": pipeline_cpu / emitted * 1e6 if emitted else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=float, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="latência simulada por _bulk")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fração de _bulk respondidos com 503")
+    parser.add_argument("--drain", type=float, default=30.0, help="segundos para drenar após a carga")
+    args = parser.parse_args()
+
+    rows: List[Dict[str, object]] = []
+    with open(os.devnull, "w") as devnull:
+        for rate in args.rates:
+            rows.append(run(rate, args, devnull))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Docs/s entregues pelo OpenSearchHandler a uma taxa sustentada (padrão 10k logs/s).
+
+Uso (a partir de app_v1/; não precisa de banco nem de OpenSearch):
+
+    python -m bench.log_shipping --rate 10000 --duration 20 --latency-ms 20
+
+Sobe o `_bulk` falso (`bench/fake_opensearch.py`), emite linhas de access log
+no ritmo pedido direto num logger com o OpenSearchHandler e, para cada
+combinação de LOG_BULK_WORKERS x LOG_BULK_GZIP, mede docs/s aceitos pelo
+servidor durante a carga, quantos foram para o spill/descartados, bytes na
+rede e o tamanho de lote ao qual o ajuste adaptativo chegou.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+from backend.logging_conf import OpenSearchHandler, UtcIsoTimeFormatter
+from backend.metrics import log_shipper_records_total
+
+from .common import print_table
+from .fake_opensearch import fake_opensearch
+
+
+def _outcomes() -> Dict[str, float]:
+    return {s.labels["outcome"]: s.value for m in log_shipper_records_total.collect()
+            for s in m.samples if s.name.endswith("_total")}
+
+
+def emit_at_rate(logger: logging.Logger, rate: float, duration: float) -> int:
+    """Emite `rate` logs/s durante `duration` s em rajadas de 10 ms; devolve o total emitido."""
+    tick = 0.01
+    per_tick = max(int(rate * tick), 1)
+    sent = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        for _ in range(per_tick):
+            logger.info("HTTP access", extra={
+                "request_id": str(uuid.uuid4()), "method": "GET", "path": "/items",
+                "status_code": 200, "duration_ms": 3, "client_ip": "10.0.0.1", "user_agent": "k6/0.49",
+            })
+        sent += per_tick
+        ahead = sent / rate - elapsed
+        if ahead > 0:
+            time.sleep(ahead)
+    return sent
+
+
+def run(workers: int, gzip: bool, args: argparse.Namespace) -> Dict[str, object]:
+    with fake_opensearch(latency_ms=args.latency_ms, fail_rate=args.fail_rate) as server, \
+            tempfile.TemporaryDirectory() as spill_dir:
+        os.environ.update({
+            "OPENSEARCH_ENABLED": "true", "OPENSEARCH_HOST": server.host, "OPENSEARCH_PORT": str(server.port),
+            "LOG_BULK_WORKERS": str(workers), "LOG_BULK_GZIP": str(gzip).lower(), "LOG_SPILL_DIR": spill_dir,
+        })
+        handler = OpenSearchHandler()
+        handler.setFormatter(UtcIsoTimeFormatter())
+        logger = logging.getLogger(f"bench.log_shipping.{workers}.{gzip}")
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+
+        before = _outcomes()
+        emitted = emit_at_rate(logger, args.rate, args.duration)
+        during = server.docs
+        # Espera drenar (fila + spill) antes de fechar
+        deadline = time.time() + args.drain
+        while server.docs < emitted and time.time() < deadline:
+            time.sleep(0.1)
+        after = _outcomes()
+        handler.close()
+    delta = {k: after.get(k, 0.0) - before.get(k, 0.0) for k in ("spilled", "dropped")}
+    return {
+        "workers": workers, "gzip": gzip, "emitted": emitted,
+        "docs_per_s": during / args.duration, "delivered": server.docs,
+        "spilled": int(delta["spilled"]), "dropped": int(delta["dropped"]),
+        "requests": server.requests, "wire_MB": server.wire_bytes / 1e6,
+        "batch_KB": handler._batch_bytes / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=10_000)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="latência simulada por _bulk")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fração de _bulk respondidos com 503")
+    parser.add_argument("--drain", type=float, default=30.0, help="segundos para drenar após a carga")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    rows: List[Dict[str, object]] = []
+    for workers in args.workers:
+        for gzip in (False, True):
+            rows.append(run(workers, gzip, args))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Custo e cardinalidade das métricas HTTP: middleware antigo vs ObservabilityMiddleware.
+
+Uso (a partir de app_v1/; não precisa de banco):
+
+    python -m bench.metrics_middleware --requests 100000
+
+Os dois apps têm um único endpoint no-op `GET /items/{item_id}` e recebem
+`--requests` chamadas, cada uma com um UUID diferente, direto pela interface
+ASGI. O "antigo" replica o `@app.middleware("http")` anterior (BaseHTTPMiddleware,
+label `path` = path bruto) num CollectorRegistry próprio; o novo é o
+`ObservabilityMiddleware` do backend só com métricas (label = template da rota). Para cada um:
+overhead por request (µs, descontado o app sem middleware), número de séries
+HTTP no registry e tamanho/tempo de um scrape (`generate_latest`).
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from fastapi import FastAPI, Request
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+from backend.middleware import ObservabilityMiddleware
+
+from .common import asgi_requests, print_table, summarize
+
+
+def _noop_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: str) -> Dict[str, str]:
+        return {"id": item_id}
+
+    return app
+
+
+def _legacy_app(registry: CollectorRegistry) -> FastAPI:
+    """Cópia do middleware anterior, com métricas num registry isolado."""
+    requests_total = Counter("http_requests_total", "", ["method", "path", "status_code"], registry=registry)
+    duration = Histogram("http_request_duration_seconds", "", ["method", "path"], registry=registry)
+    in_progress = Gauge("http_requests_in_progress", "", ["method", "path"], registry=registry)
+    app = _noop_app()
+
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next: Callable):  # type: ignore[no-untyped-def]
+        method, path = request.method, request.url.path
+        start = time.perf_counter()
+        in_progress.labels(method=method, path=path).inc()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            duration.labels(method=method, path=path).observe(time.perf_counter() - start)
+            in_progress.labels(method=method, path=path).dec()
+            requests_total.labels(method=method, path=path, status_code=str(status_code)).inc()
+
+    return app
+
+
+def _new_app() -> FastAPI:
+    app = _noop_app()
+    app.add_middleware(ObservabilityMiddleware, routes=app.router.routes, access_log=False)
+    return app
+
+
+def _http_series(registry: CollectorRegistry) -> int:
+    return sum(len(m.samples) for m in registry.collect() if m.name.startswith("http_"))
+
+
+def _scrape(registry: CollectorRegistry) -> Dict[str, float]:
+    start = time.perf_counter()
+    body = generate_latest(registry)
+    return {"scrape_kb": len(body) / 1024, "scrape_ms": (time.perf_counter() - start) * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    paths = [f"/items/{uuid.uuid4()}" for _ in range(args.requests)]
+    baseline = summarize(asgi_requests(_noop_app(), paths))
+
+    legacy_registry = CollectorRegistry()
+    variants = [("legacy (path bruto)", _legacy_app(legacy_registry), legacy_registry),
+                ("ObservabilityMiddleware", _new_app(), REGISTRY)]
+    rows: List[Dict[str, object]] = []
+    for name, app, registry in variants:
+        stats = summarize(asgi_requests(app, paths))
+        rows.append({
+            "middleware": name,
+            "p50_us": stats["p50_ms"] - baseline["p50_ms"],
+            "mean_us": stats["mean_ms"] - baseline["mean_ms"],
+            "http_series": _http_series(registry),
+            **_scrape(registry),
+        })
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
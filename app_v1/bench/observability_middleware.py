@@ -0,0 +1,127 @@
+"""Overhead por request: pilha antiga (2x BaseHTTPMiddleware) vs ObservabilityMiddleware.
+
+Uso (a partir de app_v1/; não precisa de banco):
+
+    python -m bench.observability_middleware --requests 20000
+
+Endpoint no-op `GET /noop` chamado direto pela interface ASGI. Variantes:
+
+- sem middleware (linha de base);
+- antiga: `correlation_middleware` + `metrics_middleware`, ambos via
+  `@app.middleware("http")`, como estavam antes (métricas num registry isolado);
+- `ObservabilityMiddleware` com tudo ligado e com só métricas / só access log.
+
+O access log vai para /dev/null com o mesmo formatter JSON do backend, então o
+custo de formatar a linha entra na conta das variantes que logam.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from fastapi import FastAPI, Request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from backend.logging_conf import UtcIsoTimeFormatter
+from backend.middleware import ObservabilityMiddleware
+
+from .common import asgi_requests, print_table, summarize
+
+access_logger = logging.getLogger("uvicorn.access")
+
+
+def _noop_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/noop")
+    async def noop() -> Dict[str, bool]:
+        return {"ok": True}
+
+    return app
+
+
+def _legacy_app() -> FastAPI:
+    """Cópia dos dois middlewares anteriores (ordem: correlation por fora, métricas por dentro)."""
+    registry = CollectorRegistry()
+    requests_total = Counter("http_requests_total", "", ["method", "path", "status_code"], registry=registry)
+    duration = Histogram("http_request_duration_seconds", "", ["method", "path"], registry=registry)
+    in_progress = Gauge("http_requests_in_progress", "", ["method", "path"], registry=registry)
+    app = _noop_app()
+
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next: Callable):  # type: ignore[no-untyped-def]
+        method, path = request.method, request.url.path
+        start = time.perf_counter()
+        in_progress.labels(method=method, path=path).inc()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            duration.labels(method=method, path=path).observe(time.perf_counter() - start)
+            in_progress.labels(method=method, path=path).dec()
+            requests_total.labels(method=method, path=path, status_code=str(status_code)).inc()
+
+    @app.middleware("http")
+    async def correlation_middleware(request: Request, call_next: Callable):  # type: ignore[no-untyped-def]
+        start = time.perf_counter()
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        client_ip = (request.client.host if request.client else None) or request.headers.get("X-Forwarded-For", "-")
+        user_agent = request.headers.get("User-Agent", "-")
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            response.headers.setdefault("X-Request-ID", request_id)
+            return response
+        finally:
+            access_logger.info("HTTP access", extra={
+                "request_id": request_id, "method": request.method, "path": request.url.path,
+                "status_code": status_code, "duration_ms": int((time.perf_counter() - start) * 1000),
+                "client_ip": client_ip, "user_agent": user_agent,
+            })
+
+    return app
+
+
+def _observability_app(metrics: bool, access_log: bool) -> FastAPI:
+    app = _noop_app()
+    app.add_middleware(ObservabilityMiddleware, routes=app.router.routes, metrics=metrics, access_log=access_log)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(UtcIsoTimeFormatter())
+    access_logger.handlers = [handler]
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+
+    paths = ["/noop"] * args.requests
+    variants = [
+        ("sem middleware", _noop_app()),
+        ("antiga (correlation + metrics)", _legacy_app()),
+        ("Observability (tudo)", _observability_app(metrics=True, access_log=True)),
+        ("Observability (só métricas)", _observability_app(metrics=True, access_log=False)),
+        ("Observability (só access log)", _observability_app(metrics=False, access_log=True)),
+    ]
+    rows: List[Dict[str, object]] = []
+    for name, app in variants:
+        asgi_requests(app, paths[:500])  # aquecimento
+        stats = summarize(asgi_requests(app, paths))
+        rows.append({"stack": name, "p50_us": stats["p50_ms"], "p95_us": stats["p95_ms"],
+                     "mean_us": stats["mean_ms"], "rps_1core": 1e6 / stats["mean_ms"]})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
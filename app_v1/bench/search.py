@@ -0,0 +1,129 @@
+"""Latência de GET /items/search (`repository.build_search_stmt`) com e sem o índice GIN.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um Postgres de teste):
+
+    python -m bench.search --rows 1000000
+
+Semeia `items` com títulos/descrições variados (vocabulário fixo + um token raro
+`refNNNN` por linha), mede cada consulta com `search_vector @@ tsquery` sem o
+índice GIN (Seq Scan) e com ele, e o LIKE usado fora do Postgres como
+referência. `matches` é quantas linhas casam: o ts_rank é calculado para todas
+antes do LIMIT, então termos muito comuns custam mais que termos raros.
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Callable, Dict, List
+
+from sqlalchemy import Engine, func, select, text
+from sqlalchemy.orm import Session
+
+from backend.db import SessionLocal, engine, ensure_columns, ensure_indexes
+from backend.models import Base, ItemORM
+from backend.repository import build_search_stmt
+
+from .common import measure, print_table
+
+WORDS = [
+    "relatório", "mensal", "cliente", "contrato", "revisar", "enviar", "pagamento", "fatura",
+    "reunião", "equipe", "projeto", "prazo", "servidor", "backup", "deploy", "banco",
+    "dados", "consulta", "índice", "migração", "teste", "carga", "alerta", "métrica",
+    "painel", "usuário", "senha", "acesso", "rede", "firewall", "certificado", "domínio",
+    "compra", "estoque", "pedido", "entrega", "fornecedor", "orçamento", "nota", "imposto",
+    "treinamento", "documentação", "manual", "suporte", "chamado", "incidente", "correção", "versão",
+]
+RARE_TOKENS = 20_000
+
+QUERIES = {
+    "raro": "ref4242",
+    "comum": "relatório",
+    "dois_termos": "relatório cliente",
+    "frase": '"relatório mensal"',
+    "sem_resultado": "inexistente",
+}
+GIN_INDEX = "ix_items_search_vector"
+
+
+def seed_search_items(bind: Engine, n: int) -> int:
+    """Garante `n` linhas com texto variado (o seed_items comum repete o mesmo texto)."""
+    Base.metadata.create_all(bind=bind)
+    ensure_columns(bind, Base.metadata, add_generated=True)
+    with bind.begin() as conn:
+        current = conn.execute(select(func.count()).select_from(ItemORM)).scalar_one()
+        missing = n - current
+        if missing > 0:
+            word = "(CAST(:words AS text[]))[1 + floor(random() * :nw)::int]"
+            conn.execute(text(
+                "INSERT INTO items (id, title, description, status, created_at, updated_at) "
+                f"SELECT gen_random_uuid(), {word} || ' ' || {word} || ' ref' || (g % :rare), "
+                f"concat_ws(' ', {', '.join([word] * 12)}), "
+                "(ARRAY['pending','in_progress','done'])[1 + g % 3]::status, "
+                "now() - make_interval(secs => g), now() "
+                "FROM generate_series(1, :n) AS g"
+            ), {"n": missing, "words": WORDS, "nw": len(WORDS), "rare": RARE_TOKENS})
+            conn.execute(text("ANALYZE items"))
+        return max(current, n)
+
+
+def _scenarios(session: Session, limit: int) -> Dict[str, Callable[[], object]]:
+    scenarios: Dict[str, Callable[[], object]] = {}
+    for name, q in QUERIES.items():
+        stmt = build_search_stmt("postgresql", q, limit=limit)
+        scenarios[name] = lambda stmt=stmt: session.execute(stmt).all()
+    return scenarios
+
+
+def _matches(session: Session, q: str) -> int:
+    query = func.websearch_to_tsquery("simple", q)
+    return session.execute(
+        select(func.count()).select_from(ItemORM).where(ItemORM.search_vector.bool_op("@@")(query))
+    ).scalar_one()
+
+
+def _run(phase: str, limit: int, repeat: int) -> List[Dict[str, object]]:
+    rows: List[Dict[str, object]] = []
+    with SessionLocal() as session:
+        for name, fn in _scenarios(session, limit).items():
+            rows.append({"phase": phase, "query": name, "matches": _matches(session, QUERIES[name]),
+                         **measure(fn, repeat=repeat, warmup=2)})
+    return rows
+
+
+def _run_like(limit: int, repeat: int) -> List[Dict[str, object]]:
+    rows: List[Dict[str, object]] = []
+    with SessionLocal() as session:
+        for name in ("raro", "comum"):
+            stmt = build_search_stmt("like", QUERIES[name], limit=limit)
+            rows.append({"phase": "like", "query": name, "matches": "-",
+                         **measure(lambda: session.execute(stmt).all(), repeat=repeat, warmup=1)})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Benchmark requer Postgres (DATABASE_URL=postgresql+psycopg://...)")
+
+    total = seed_search_items(engine, args.rows)
+    print(f"items: {total} linhas")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f'DROP INDEX IF EXISTS "{GIN_INDEX}"'))
+        conn.execute(text("ANALYZE items"))
+    before = _run("sem_gin", args.limit, max(3, args.repeat // 5))
+
+    ensure_indexes(engine, Base.metadata)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE items"))
+    after = _run("com_gin", args.limit, args.repeat)
+
+    print_table(before + after + _run_like(args.limit, max(3, args.repeat // 5)))
+
+
+if __name__ == "__main__":
+    main()
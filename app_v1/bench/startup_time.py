@@ -0,0 +1,72 @@
+"""Tempo de startup: `python -X importtime` de backend.main e tempo até o primeiro 200.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um banco de teste):
+
+    python -m bench.startup_time --runs 5
+
+- importtime: importa `backend.main` num processo novo (OPENSEARCH_ENABLED false e
+  true) e mostra o total e os pacotes raiz mais caros (tempo próprio somado);
+- primeiro 200: sobe `uvicorn backend.main:app` e mede do `Popen` ao primeiro
+  `GET /items?limit=1` com 200, com DB_CREATE_SCHEMA=true e false (mediana de --runs).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from .common import print_table, run_server
+
+
+def import_times(env: Dict[str, str]) -> Tuple[float, List[Tuple[str, float]]]:
+    """(ms cumulativos de backend.main, [(pacote raiz, ms de import próprio)] em ordem decrescente)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env={**os.environ, **env}, capture_output=True, text=True, check=True,
+    )
+    top: Dict[str, float] = {}
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == "backend.main":
+            total = int(cumulative) / 1000
+        # Tempo próprio somado por pacote raiz (fastapi, sqlalchemy, opensearchpy...)
+        package = name.strip().split(".")[0]
+        top[package] = top.get(package, 0.0) + int(self_us) / 1000
+    return total, sorted(top.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    rows: List[Dict[str, object]] = []
+    for opensearch in ("false", "true"):
+        env = {"OPENSEARCH_ENABLED": opensearch, "OPENSEARCH_HOST": "127.0.0.1"}
+        totals = [import_times(env)[0] for _ in range(args.runs)]
+        _, top = import_times(env)
+        rows.append({"OPENSEARCH_ENABLED": opensearch, "import_ms": statistics.median(totals),
+                     "top": ", ".join(f"{name} {ms:.0f}" for name, ms in top[:args.top])})
+    print_table(rows)
+    print()
+
+    rows = []
+    for create_schema in ("true", "false"):
+        samples = []
+        for _ in range(args.runs):
+            with run_server({"DB_CREATE_SCHEMA": create_schema}, poll_interval=0.005) as server:
+                samples.append(server.startup_seconds * 1000)
+        rows.append({"DB_CREATE_SCHEMA": create_schema, "first_200_ms_p50": statistics.median(samples),
+                     "min_ms": min(samples), "max_ms": max(samples)})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Statements e latência por escrita: ORM get + mutate + commit + refresh vs. RETURNING.
+
+Uso (a partir de app_v1/, com DATABASE_URL apontando para um banco de teste):
+
+    python -m bench.write_statements --repeat 200
+
+Conta os statements enviados ao banco (evento `before_cursor_execute`, mais o
+COMMIT) em cada create/update/delete das duas implementações.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.db import SessionLocal, engine
+from backend.enums import Status
+from backend.models import Base, ItemORM
+from backend import repository
+from backend.schemas import ItemCreate, ItemUpdate
+
+from .common import print_table, summarize
+
+
+# Implementação anterior (referência)
+
+def legacy_create(session: Session, data: ItemCreate) -> ItemORM:
+    obj = ItemORM(title=data.title, description=data.description, status=data.status or Status.pending)
+    session.add(obj)
+    session.commit()
+    session.refresh(obj)
+    return obj
+
+def legacy_update(session: Session, id: uuid.UUID, data: ItemUpdate) -> ItemORM | None:
+    obj = session.get(ItemORM, id)
+    if not obj:
+        return None
+    if data.status is not None:
+        obj.status = data.status
+    session.commit()
+    session.refresh(obj)
+    return obj
+
+def legacy_delete(session: Session, id: uuid.UUID) -> bool:
+    obj = session.get(ItemORM, id)
+    if not obj:
+        return False
+    session.delete(obj)
+    session.commit()
+    return True
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __enter__(self) -> "StatementCounter":
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_execute)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+        event.remove(engine, "commit", self._on_execute)
+
+    def _on_execute(self, *args: object) -> None:
+        self.count += 1
+
+
+def _run(op: Callable[[Session, uuid.UUID], object], ids: List[uuid.UUID]) -> Dict[str, float]:
+    samples: List[float] = []
+    with SessionLocal() as session, StatementCounter() as counter:
+        for id in ids:
+            start = time.perf_counter()
+            op(session, id)
+            samples.append((time.perf_counter() - start) * 1000)
+            session.expunge_all()
+    return {"statements": counter.count / len(ids), **summarize(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    Base.metadata.create_all(bind=engine)
+
+    data = ItemCreate(title="bench-write", description="bench")
+    upd = ItemUpdate(status=Status.done)
+    impls: Dict[str, Dict[str, Callable[[Session, uuid.UUID], object]]] = {
+        "legacy_orm": {
+            "create": lambda s, _id: legacy_create(s, data),
+            "update": lambda s, id: legacy_update(s, id, upd),
+            "delete": legacy_delete,
+        },
+        "returning": {
+            "create": lambda s, _id: repository.create_item(s, data),
+            "update": lambda s, id: repository.update_item(s, id, upd),
+            "delete": repository.delete_item,
+        },
+    }
+
+    rows: List[Dict[str, object]] = []
+    for impl, ops in impls.items():
+        # Cada operação recebe `repeat` ids próprios (delete consome os seus)
+        with SessionLocal() as session:
+            ids = [row.id for row in repository.create_items(session, [data] * args.repeat)]
+        for name, op in ops.items():
+            rows.append({"impl": impl, "op": name, **_run(op, ids)})
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
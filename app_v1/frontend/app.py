@@ -25,6 +25,12 @@ client = httpx.Client(base_url=API_BASE, timeout=10.0)
 
 STATUS_OPCOES = ["", "pending", "in_progress", "done"]
 
+
+def _if_match() -> Dict[str, str]:
+    # Concorrência otimista: só altera se o item ainda está na versão buscada
+    etag = st.session_state.get("_item_etag")
+    return {"If-Match": etag} if etag else {}
+
 with TAB_LISTAR:
     st.subheader("Listar Itens")
     col_f1, col_f2, col_f3 = st.columns(3)
@@ -39,16 +45,28 @@ with TAB_LISTAR:
         params = {"limit": limit, "offset": offset}
         if status_filter:
             params["status"] = status_filter
+        # GET condicional: com o mesmo filtro, 304 reaproveita a última página
+        cache_key = repr(sorted(params.items()))
+        anterior = st.session_state.get("_lista")
+        headers = {}
+        if anterior and anterior["key"] == cache_key:
+            headers["If-None-Match"] = anterior["etag"]
         try:
-            r = client.get("/items", params=params)
-            if r.status_code == 200:
+            r = client.get("/items", params=params, headers=headers)
+            data = None
+            if r.status_code == 304:
+                data = anterior["data"]
+            elif r.status_code == 200:
                 data = r.json()
+                if r.headers.get("ETag"):
+                    st.session_state["_lista"] = {"key": cache_key, "etag": r.headers["ETag"], "data": data}
+            else:
+                st.error(f"Erro: {r.status_code} - {r.text}")
+            if data is not None:
                 if data:
                     st.dataframe(data, use_container_width=True)
                 else:
                     st.info("Nenhum item.")
-            else:
-                st.error(f"Erro: {r.status_code} - {r.text}")
         except Exception as e:
             st.error(f"Falha na requisição: {e}")
 
@@ -78,6 +96,7 @@ with TAB_EDITAR:
             r = client.get(f"/items/{busc_id}")
             if r.status_code == 200:
                 st.session_state["_item_edit"] = r.json()
+                st.session_state["_item_etag"] = r.headers.get("ETag")
             else:
                 st.error("Não encontrado")
         except Exception as e:
@@ -94,20 +113,25 @@ with TAB_EDITAR:
             if submitted_edit:
                 payload = {"title": new_title, "description": new_description or None, "status": new_status}
                 try:
-                    r = client.put(f"/items/{item_edit['id']}", json=payload)
+                    r = client.put(f"/items/{item_edit['id']}", json=payload, headers=_if_match())
                     if r.status_code == 200:
                         st.success("Atualizado")
                         st.session_state["_item_edit"] = r.json()
+                        st.session_state["_item_etag"] = r.headers.get("ETag")
+                    elif r.status_code == 412:
+                        st.warning("O item foi alterado por outra pessoa. Busque novamente antes de salvar.")
                     else:
                         st.error(f"Erro {r.status_code}: {r.text}")
                 except Exception as e:
                     st.error(f"Falha: {e}")
         if st.button("Excluir", type="primary"):
             try:
-                r = client.delete(f"/items/{item_edit['id']}")
+                r = client.delete(f"/items/{item_edit['id']}", headers=_if_match())
                 if r.status_code == 204:
                     st.success("Excluído")
                     st.session_state.pop("_item_edit", None)
+                elif r.status_code == 412:
+                    st.warning("O item foi alterado por outra pessoa. Busque novamente antes de excluir.")
                 else:
                     st.error(f"Erro {r.status_code}: {r.text}")
             except Exception as e:
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Settings são lidas no import de backend.*: o ambiente precisa estar pronto antes
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{Path(tempfile.gettempdir()) / 'items-api-test.db'}")
+os.environ.setdefault('OPENSEARCH_ENABLED', 'false')
+os.environ.setdefault('ACCESS_LOG_ENABLED', 'false')
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    from backend import db
+    from backend.main import app
+
+    # Banco SQLite novo por teste (o engine é criado no primeiro uso)
+    monkeypatch.setattr(db.settings, 'DATABASE_URL', f"sqlite:///{tmp_path / 'items.db'}")
+    monkeypatch.setattr(db, '_engine', None)
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from backend.admission import AdaptiveLimit, AdmissionControlMiddleware
+
+SCOPE = {"type": "http", "path": "/items", "method": "GET"}
+
+
+def _middleware(app: Any) -> tuple[AdmissionControlMiddleware, AdaptiveLimit]:
+    read = AdaptiveLimit("read", 10, 1, 100)
+    write = AdaptiveLimit("write", 10, 1, 100)
+    return AdmissionControlMiddleware(app, read=read, write=write), read
+
+
+async def _send(message: Any) -> None:
+    pass
+
+
+def _respond(status: int) -> Any:
+    async def app(scope: Any, receive: Any, send: Any) -> None:
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+def test_sent_5xx_shrinks_limit() -> None:
+    mw, read = _middleware(_respond(503))
+
+    asyncio.run(mw(SCOPE, None, _send))
+
+    assert read.limit == 9
+    assert read.in_flight == 0
+
+
+def test_cancelled_request_releases_without_shrinking() -> None:
+    async def app(scope: Any, receive: Any, send: Any) -> None:
+        await asyncio.sleep(10)
+
+    mw, read = _middleware(app)
+
+    async def run() -> None:
+        task = asyncio.create_task(mw(SCOPE, None, _send))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert read.limit == 10
+    assert read.in_flight == 0
+
+
+def test_unhandled_exception_counts_as_failure() -> None:
+    async def app(scope: Any, receive: Any, send: Any) -> None:
+        raise TimeoutError
+
+    mw, read = _middleware(app)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(mw(SCOPE, None, _send))
+
+    assert read.limit == 9
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main, repository
+
+
+def _create(client: TestClient, *titles: str) -> list[str]:
+    resp = client.post('/items:batch', json={'items': [{'title': t} for t in titles]})
+    assert resp.status_code == 200
+    return [r['id'] for r in resp.json()['results']]
+
+
+def test_create_returns_results_in_request_order(client: TestClient) -> None:
+    resp = client.post('/items:batch', json={'items': [{'title': 'a'}, {'title': 'b', 'status': 'done'}]})
+
+    results = resp.json()['results']
+    assert [(r['index'], r['result'], r['item']['title']) for r in results] == [(0, 'created', 'a'), (1, 'created', 'b')]
+    assert results[1]['item']['status'] == 'done'
+
+
+def test_update_and_delete_report_not_found(client: TestClient) -> None:
+    a, b = _create(client, 'a', 'b')
+    missing = str(uuid.uuid4())
+
+    updated = client.patch('/items:batch', json={'items': [
+        {'id': a, 'title': 'a2'}, {'id': missing, 'title': 'x'}, {'id': b, 'status': 'done'},
+    ]}).json()['results']
+    deleted = client.request('DELETE', '/items:batch', json={'ids': [missing, a]}).json()['results']
+
+    assert [(r['id'], r['result']) for r in updated] == [(a, 'updated'), (missing, 'not_found'), (b, 'updated')]
+    assert updated[0]['item']['title'] == 'a2' and updated[2]['item']['status'] == 'done'
+    assert updated[1]['item'] is None
+    assert [(r['id'], r['result']) for r in deleted] == [(missing, 'not_found'), (a, 'deleted')]
+    assert [i['id'] for i in client.get('/items').json()] == [b]
+
+
+def test_batch_over_limit_is_rejected(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(main.settings, 'BATCH_MAX_ITEMS', 2)
+
+    resp = client.post('/items:batch', json={'items': [{'title': 'a'}, {'title': 'b'}, {'title': 'c'}]})
+
+    assert resp.status_code == 400
+    assert client.get('/items').json() == []
+
+
+def test_batch_is_all_or_nothing(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    (a,) = _create(client, 'a')
+
+    def fail(*args: object) -> None:
+        raise RuntimeError('falha depois das escritas, antes do commit')
+
+    monkeypatch.setattr(repository, 'publish', fail)
+    with pytest.raises(RuntimeError):
+        client.post('/items:batch', json={'items': [{'title': 'b'}, {'title': 'c'}]})
+    with pytest.raises(RuntimeError):
+        client.patch('/items:batch', json={'items': [{'id': a, 'title': 'changed'}]})
+    with pytest.raises(RuntimeError):
+        client.request('DELETE', '/items:batch', json={'ids': [a]})
+
+    assert [(i['id'], i['title']) for i in client.get('/items').json()] == [(a, 'a')]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+import redis
+from fastapi.testclient import TestClient
+
+from backend import cache
+
+
+class _DownRedis:
+    """Cliente que falha como um Redis fora do ar."""
+
+    def __getattr__(self, name: str) -> Any:
+        def fail(*args: Any, **kwargs: Any) -> Any:
+            raise redis.ConnectionError('redis fora do ar')
+        return fail
+
+
+@pytest.fixture
+def down_cache(monkeypatch: pytest.MonkeyPatch) -> cache.RedisCache:
+    backend = cache.RedisCache('redis://127.0.0.1:1/0', ttl=5)
+    monkeypatch.setattr(backend, '_client', _DownRedis())
+    monkeypatch.setattr(cache.item_cache, 'backend', backend)
+    return backend
+
+
+def test_redis_outage_falls_back_to_database(client: TestClient, down_cache: cache.RedisCache) -> None:
+    created = client.post('/items', json={'title': 'a'})
+    assert created.status_code == 201
+    item_id = created.json()['id']
+
+    assert client.get(f'/items/{item_id}').json()['title'] == 'a'
+    assert [i['id'] for i in client.get('/items').json()] == [item_id]
+    assert client.put(f'/items/{item_id}', json={'title': 'b'}).status_code == 200
+    assert client.delete(f'/items/{item_id}').status_code == 204
+
+
+def test_failed_backend_calls_are_counted(down_cache: cache.RedisCache) -> None:
+    errors = cache.cache_errors_total.labels(backend='redis', op='get')
+    before = errors._value.get()
+
+    assert down_cache.get('k') is None
+    down_cache.set('k', 'v')
+    assert down_cache.incr('gen') is None
+    assert down_cache.generation('gen') is None
+
+    assert errors._value.get() == before + 1
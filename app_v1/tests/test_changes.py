@@ -0,0 +1,50 @@
+from sqlalchemy import create_engine
+
+from backend import changes
+from backend.config import Settings
+from backend.db import pool_limits
+
+
+def _settings(**overrides):
+    settings = Settings()
+    values = {
+        'DB_CONNECTION_BUDGET': 40, 'WEB_CONCURRENCY': 4, 'DB_ASYNC': False,
+        'DB_POOL_SIZE': 100, 'DB_MAX_OVERFLOW': 100, 'CHANGE_EVENTS_ENABLED': True,
+        'DATABASE_URL': 'postgresql+psycopg://u:p@db/app',
+    }
+    for name, value in {**values, **overrides}.items():
+        setattr(settings, name, value)
+    return settings
+
+
+def _total(settings, listen):
+    pool_size, max_overflow = pool_limits(settings)
+    engines = 2 if settings.DB_ASYNC else 1
+    return settings.WEB_CONCURRENCY * (engines * (pool_size + max_overflow) + listen)
+
+
+def test_budget_reserves_listen_connection_per_worker():
+    settings = _settings()
+    assert pool_limits(settings) == (9, 0)
+    assert _total(settings, listen=1) <= 40
+
+
+def test_budget_reserves_listen_connection_with_async_engine():
+    settings = _settings(DB_ASYNC=True, DB_CONNECTION_BUDGET=20)
+    assert _total(settings, listen=1) <= 20
+
+
+def test_budget_without_change_events_uses_everything():
+    assert pool_limits(_settings(CHANGE_EVENTS_ENABLED=False)) == (10, 0)
+    assert pool_limits(_settings(DATABASE_URL='sqlite:///x.db')) == (10, 0)
+
+
+def test_missing_change_seq_disables_publishing(monkeypatch):
+    monkeypatch.setattr(changes, '_seq_available', False)
+    assert not changes.publish_enabled('postgresql')
+    assert not changes.changes_available('postgresql+psycopg://u:p@db/app')
+
+
+def test_check_change_seq_ignores_other_databases(monkeypatch, tmp_path):
+    monkeypatch.setattr(changes, '_seq_available', True)
+    assert changes.check_change_seq(create_engine(f'sqlite:///{tmp_path}/c.db')) is True
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.compression import negotiate_encoding
+
+
+@pytest.mark.parametrize(('header', 'expected'), [
+    ('gzip, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+    ('*', 'br'),
+    ('*;q=0.5, gzip;q=0.8', 'gzip'),
+    ('identity', None),
+    ('', None),
+    ('gzip;q=abc, br', 'br'),
+])
+def test_negotiation_follows_q_values(header: str, expected: str | None) -> None:
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiation_without_brotli() -> None:
+    assert negotiate_encoding('br, gzip;q=0.1', brotli_available=False) == 'gzip'
+    assert negotiate_encoding('br', brotli_available=False) is None
+
+
+def _create(client: TestClient, n: int) -> None:
+    client.post('/items:batch', json={'items': [{'title': f'item {i}', 'description': 'x' * 50} for i in range(n)]})
+
+
+def test_small_responses_are_not_compressed(client: TestClient) -> None:
+    _create(client, 1)
+
+    resp = client.get('/items', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(resp.content) < 1024
+    assert 'content-encoding' not in resp.headers
+
+
+def test_responses_over_threshold_are_compressed(client: TestClient) -> None:
+    _create(client, 30)
+
+    resp = client.get('/items', params={'limit': 30}, headers={'Accept-Encoding': 'gzip'})
+
+    assert resp.headers['content-encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resp.headers['vary']
+    assert int(resp.headers['content-length']) < len(resp.content)
+    assert len(resp.json()) == 30
+
+
+def test_identity_when_client_refuses_compression(client: TestClient) -> None:
+    _create(client, 30)
+
+    resp = client.get('/items', params={'limit': 30}, headers={'Accept-Encoding': 'gzip;q=0, br;q=0'})
+
+    assert 'content-encoding' not in resp.headers
+    assert len(resp.json()) == 30
+
+
+def test_streamed_export_is_compressed(client: TestClient) -> None:
+    _create(client, 50)
+
+    with client.stream('GET', '/items/export', headers={'Accept-Encoding': 'gzip'}) as resp:
+        assert resp.headers['content-encoding'] == 'gzip'
+        assert 'content-length' not in resp.headers
+        raw = b''.join(resp.iter_raw())
+
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert len(lines) == 50
+    assert {json.loads(line)['title'] for line in lines} == {f'item {i}' for i in range(50)}
+
+
+def test_brotli_when_preferred(client: TestClient) -> None:
+    pytest.importorskip('brotli')
+    _create(client, 30)
+
+    resp = client.get('/items', params={'limit': 30}, headers={'Accept-Encoding': 'gzip;q=0.5, br'})
+
+    assert resp.headers['content-encoding'] == 'br'
+    assert len(resp.json()) == 30
@@ -0,0 +1,35 @@
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+
+from backend import counters
+from backend.repository import build_status_counts_stmt
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_postgres_counts_fall_back_to_count_without_triggers(monkeypatch):
+    monkeypatch.setattr(counters, '_counters_active', False)
+    sql = _sql(build_status_counts_stmt('postgresql'))
+    assert 'item_status_counts' not in sql
+    assert 'count(*)' in sql
+
+
+def test_postgres_counts_read_counter_table_with_triggers(monkeypatch):
+    monkeypatch.setattr(counters, '_counters_active', True)
+    assert 'FROM item_status_counts' in _sql(build_status_counts_stmt('postgresql'))
+
+
+def test_check_status_counters_is_off_outside_postgres(monkeypatch, tmp_path):
+    monkeypatch.setattr(counters, '_counters_active', True)
+    assert counters.check_status_counters(create_engine(f'sqlite:///{tmp_path}/c.db')) is False
+    assert counters.counters_active() is False
+
+
+def test_stats_match_rows(client):
+    for status in ('pending', 'pending', 'done'):
+        assert client.post('/items', json={'title': 't', 'status': status}).status_code == 201
+    stats = client.get('/items/stats').json()
+    assert stats['total'] == 3
+    assert stats['by_status']['pending'] == 2
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import cache, main
+
+
+def test_put_with_if_match_from_get_succeeds(client: TestClient) -> None:
+    item_id = client.post('/items', json={'title': 'a'}).json()['id']
+    etag = client.get(f'/items/{item_id}').headers['ETag']
+
+    resp = client.put(f'/items/{item_id}', json={'title': 'b'}, headers={'If-Match': etag})
+
+    assert resp.status_code == 200
+    assert resp.json()['title'] == 'b'
+
+
+def test_put_with_stale_if_match_is_rejected(client: TestClient) -> None:
+    item_id = client.post('/items', json={'title': 'a'}).json()['id']
+
+    resp = client.put(f'/items/{item_id}', json={'title': 'b'}, headers={'If-Match': 'W/"1"'})
+
+    assert resp.status_code == 412
+
+
+def test_second_write_with_first_etag_is_rejected(client: TestClient) -> None:
+    item_id = client.post('/items', json={'title': 'a'}).json()['id']
+    first = client.get(f'/items/{item_id}').headers['ETag']
+
+    # Mesmo segundo: no SQLite updated_at ainda precisa mudar a cada escrita
+    assert client.put(f'/items/{item_id}', json={'title': 'b'}, headers={'If-Match': first}).status_code == 200
+    assert client.put(f'/items/{item_id}', json={'title': 'c'}, headers={'If-Match': first}).status_code == 412
+    assert client.delete(f'/items/{item_id}', headers={'If-Match': first}).status_code == 412
+
+    current = client.get(f'/items/{item_id}').headers['ETag']
+    assert current != first
+    assert client.delete(f'/items/{item_id}', headers={'If-Match': current}).status_code == 204
+
+
+def test_quick_successive_updates_change_the_etag(client: TestClient) -> None:
+    item_id = client.post('/items', json={'title': 'a'}).json()['id']
+    etags = [client.get(f'/items/{item_id}').headers['ETag']]
+    for title in 'bcde':
+        etags.append(client.put(f'/items/{item_id}', json={'title': title}, headers={'If-Match': etags[-1]}).headers['ETag'])
+
+    assert len(set(etags)) == len(etags)
+
+
+def test_list_etag_changes_after_write_with_same_max_and_count(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(main.settings, 'LIST_ETAG', True)
+    monkeypatch.setattr(cache.item_cache, 'backend', cache.MemoryCache(ttl=60, max_entries=100))
+    # Delete + insert que deixam max(updated_at) e count iguais
+    version = (datetime(2024, 1, 1, tzinfo=timezone.utc), 1)
+    monkeypatch.setattr(cache.repository, 'get_list_version', lambda session, status=None: version)
+    first = client.get('/items').headers['ETag']
+
+    client.post('/items', json={'title': 'a'})
+    resp = client.get('/items', headers={'If-None-Match': first})
+
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] != first
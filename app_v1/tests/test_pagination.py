@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def test_cursor_walks_every_page_once(client: TestClient) -> None:
+    # Tudo no mesmo segundo: no SQLite created_at empata e o desempate é o id
+    created = {client.post('/items', json={'title': f't{i}'}).json()['id'] for i in range(7)}
+
+    seen: list[str] = []
+    params = {'limit': 2}
+    for _ in range(10):
+        resp = client.get('/items', params=params)
+        assert resp.status_code == 200
+        seen += [item['id'] for item in resp.json()]
+        cursor = resp.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+        params = {'limit': 2, 'cursor': cursor}
+    else:
+        raise AssertionError('X-Next-Cursor não terminou')
+
+    assert len(seen) == len(set(seen)) == 7
+    assert set(seen) == created
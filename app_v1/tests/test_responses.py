@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import responses
+from backend.enums import Status
+
+
+def test_fields_projection_without_orjson(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    client.post('/items', json={'title': 'a', 'description': 'ç'})
+    expected = client.get('/items', params={'fields': 'id,title,status,updated_at'})
+    monkeypatch.setattr(responses, 'orjson', None)
+
+    resp = client.get('/items', params={'fields': 'id,title,status,updated_at'})
+
+    assert resp.status_code == 200
+    assert resp.json() == expected.json()
+
+
+def test_render_json_fallback_matches_orjson(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip('orjson')
+    item = client.post('/items', json={'title': 'a', 'description': 'ç'}).json()
+    from backend.db import SessionLocal
+    from backend.repository import list_item_rows
+
+    with SessionLocal() as session:
+        rows = list_item_rows(session, limit=10)
+    fast = responses.render_json(rows)
+    monkeypatch.setattr(responses, 'orjson', None)
+
+    assert responses.render_json(rows) == fast
+    assert json.loads(fast)[0]['id'] == item['id']
+
+
+def test_render_json_fallback_formats_like_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip('orjson')
+    content = [{
+        'id': uuid.UUID(int=1), 'status': Status.pending,
+        'at': datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc), 'whole': datetime(2024, 1, 2, tzinfo=timezone.utc),
+    }]
+    fast = responses.render_json(content)
+    monkeypatch.setattr(responses, 'orjson', None)
+
+    assert responses.render_json(content) == fast
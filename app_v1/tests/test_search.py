@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def items(client):
+    titles = ['100% done', '100 percent', 'snake_case', 'snakeXcase', r'C:\temp', 'C:temp']
+    for title in titles:
+        assert client.post('/items', json={'title': title}).status_code == 201
+    return titles
+
+
+def _titles(client, q):
+    response = client.get('/items/search', params={'q': q})
+    assert response.status_code == 200
+    return sorted(item['title'] for item in response.json())
+
+
+def test_percent_is_literal(client, items):
+    assert _titles(client, '100%') == ['100% done']
+
+
+def test_underscore_is_literal(client, items):
+    assert _titles(client, 'snake_case') == ['snake_case']
+
+
+def test_backslash_is_literal(client, items):
+    assert _titles(client, 'C:\\') == [r'C:\temp']
+
+
+def test_title_hits_rank_above_description(client):
+    client.post('/items', json={'title': 'other', 'description': 'mentions widget'})
+    client.post('/items', json={'title': 'Widget'})
+    response = client.get('/items/search', params={'q': 'widget'})
+    assert [item['title'] for item in response.json()] == ['Widget', 'other']
+
+
+@pytest.mark.parametrize('q', ['', '   '])
+def test_blank_query_is_rejected(client, items, q):
+    response = client.get('/items/search', params={'q': q})
+    assert response.status_code == 400
+
+
+def test_missing_query_is_rejected(client):
+    assert client.get('/items/search').status_code == 422
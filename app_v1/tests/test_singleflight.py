@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.cache import item_cache
+from backend.metrics import singleflight_requests_total
+from backend.singleflight import AsyncSingleFlight, SingleFlight, list_flight, list_flight_async
+
+
+def _followers(name: str) -> float:
+    return singleflight_requests_total.labels(name=name, role='follower')._value.get()
+
+
+def _wait_followers(name: str, n: float, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while _followers(name) < n:
+        assert time.monotonic() < deadline, 'followers não entraram no voo'
+        time.sleep(0.005)
+
+
+class _Leader:
+    """Função do leader que só termina quando `release` é sinalizado."""
+
+    def __init__(self, result=None, error=None):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(2)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _run_threads(flight, key, fns):
+    results = [None] * len(fns)
+
+    def run(i, fn):
+        try:
+            results[i] = flight.do(key, fn)
+        except Exception as e:
+            results[i] = e
+
+    threads = []
+    for i, fn in enumerate(fns):
+        t = threading.Thread(target=run, args=(i, fn))
+        t.start()
+        threads.append(t)
+        if i == 0:
+            assert fn.started.wait(2)
+    return threads, results
+
+
+def test_followers_get_leader_result():
+    flight = SingleFlight('t-result')
+    leader = _Leader(result=['page'])
+    base = _followers('t-result')
+    threads, results = _run_threads(flight, 'k', [leader] + [_Leader(result='other')] * 3)
+    _wait_followers('t-result', base + 3)
+    leader.release.set()
+    for t in threads:
+        t.join(2)
+    assert leader.calls == 1
+    assert results == [['page']] * 4
+    assert all(r is results[0] for r in results)
+
+
+def test_leader_exception_reaches_followers():
+    flight = SingleFlight('t-error')
+    error = RuntimeError('db down')
+    leader = _Leader(error=error)
+    base = _followers('t-error')
+    threads, results = _run_threads(flight, 'k', [leader, _Leader(result='other'), _Leader(result='other')])
+    _wait_followers('t-error', base + 2)
+    leader.release.set()
+    for t in threads:
+        t.join(2)
+    assert results == [error] * 3
+    # O voo terminou: a próxima chamada executa de novo
+    assert flight.do('k', lambda: 'fresh') == 'fresh'
+
+
+def test_forget_starts_a_new_flight():
+    flight = SingleFlight('t-forget')
+    old = _Leader(result='before write')
+    threads, results = _run_threads(flight, 'k', [old])
+    flight.forget()
+    # Leitura depois da escrita: não se junta à consulta em andamento
+    assert flight.do('k', lambda: 'after write') == 'after write'
+    old.release.set()
+    threads[0].join(2)
+    assert results == ['before write']
+
+
+def test_cache_invalidate_forgets_list_flights():
+    epochs = list_flight._epoch, list_flight_async._epoch
+    item_cache.invalidate()
+    assert (list_flight._epoch, list_flight_async._epoch) == (epochs[0] + 1, epochs[1] + 1)
+
+
+def test_disabled_flight_always_calls():
+    flight = SingleFlight('t-off', enabled=False)
+    calls = []
+    assert [flight.do('k', lambda: calls.append(1) or len(calls)) for _ in range(2)] == [1, 2]
+
+
+class _AsyncLeader:
+    def __init__(self, result=None, error=None):
+        self.release = asyncio.Event()
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def _other():
+    return 'other'
+
+
+def test_async_followers_get_leader_result():
+    async def main():
+        flight = AsyncSingleFlight('a-result')
+        leader = _AsyncLeader(result=['page'])
+        tasks = [asyncio.create_task(flight.do('k', leader))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(flight.do('k', _other)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.release.set()
+        return leader.calls, await asyncio.gather(*tasks)
+
+    calls, results = asyncio.run(main())
+    assert calls == 1
+    assert results == [['page']] * 4
+
+
+def test_async_leader_exception_reaches_followers():
+    async def main():
+        flight = AsyncSingleFlight('a-error')
+        leader = _AsyncLeader(error=RuntimeError('db down'))
+        tasks = [asyncio.create_task(flight.do('k', leader))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(flight.do('k', _other)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [str(r) for r in results] == ['db down'] * 3
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_async_forget_starts_a_new_flight():
+    async def main():
+        flight = AsyncSingleFlight('a-forget')
+        old = _AsyncLeader(result='before write')
+        task = asyncio.create_task(flight.do('k', old))
+        await asyncio.sleep(0)
+        flight.forget()
+
+        async def fresh():
+            return 'after write'
+
+        # Sem forget() efetivo, ficaria esperando o leader antigo
+        after = await asyncio.wait_for(flight.do('k', fresh), 2)
+        old.release.set()
+        return await task, after
+
+    assert asyncio.run(main()) == ('before write', 'after write')
+
+
+def test_async_cancelled_leader_hands_over_to_follower():
+    async def main():
+        flight = AsyncSingleFlight('a-cancel')
+        leader = _AsyncLeader(result='never')
+        first = asyncio.create_task(flight.do('k', leader))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do('k', _other))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await follower
+
+    # O follower não herda o cancelamento: refaz a consulta como novo leader
+    assert asyncio.run(main()) == 'other'